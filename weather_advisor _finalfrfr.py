@@ -1,5 +1,6 @@
 import requests
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import seaborn as sns
 import pandas as pd
 import numpy as np
@@ -10,9 +11,45 @@ import json
 import os
 import platform
 import time
+import random
+import hashlib
+import bisect
+import contextlib
+import functools
+import threading
+import argparse
+import shutil
+import heapq
+import zlib
+import math
+import sqlite3
+import cProfile
+import io
+import pstats
+import tracemalloc
+import sys
+import struct
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
 import nltk
 from nltk.tokenize import word_tokenize
 
+# Use a faster JSON library for report serialisation if one is installed
+try:
+    import orjson
+    JSON_CODEC = "orjson"
+except ImportError:
+    orjson = None
+    try:
+        import ujson
+        JSON_CODEC = "ujson"
+    except ImportError:
+        ujson = None
+        JSON_CODEC = "json"
+
 # Download NLTK data if not already present
 try:
     nltk.data.find('tokenizers/punkt')
@@ -24,13 +61,712 @@ API_KEY = "a2d2296beda67fc9855b4eb3559e24b3"
  
 BASE_URL = "https://api.openweathermap.org/data/2.5"
 
-def get_weather_data(location, forecast_days=5):
+# Metrics configuration
+# Instrumentation is off by default; when disabled, measure_stage hands back a shared
+# no-op context manager so the only cost is one dictionary lookup per stage
+METRICS_CONFIG = {"enabled": False}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+METRICS = {"histograms": {}, "counters": {}}
+
+# Fetch threads record metrics concurrently, so updates go through this lock
+_METRICS_LOCK = threading.Lock()
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def enable_metrics(enabled=True):
+    """
+    Turn latency, counter and payload-size instrumentation on or off.
+
+    Args:
+        enabled (bool): Whether to record metrics
+    """
+    METRICS_CONFIG["enabled"] = enabled
+
+
+def reset_metrics():
+    """
+    Clear all recorded metrics.
+    """
+    with _METRICS_LOCK:
+        METRICS["histograms"].clear()
+        METRICS["counters"].clear()
+
+
+def count_metric(name, amount=1, **labels):
+    """
+    Increase a counter such as api_calls, api_errors or cache_hits.
+
+    Args:
+        name (str): Counter name
+        amount (int): How much to add
+        **labels: Label values, e.g. status=404
+    """
+    if not METRICS_CONFIG["enabled"]:
+        return
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _METRICS_LOCK:
+        METRICS["counters"][key] = METRICS["counters"].get(key, 0) + amount
+
+
+def observe_metric(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """
+    Record a value in a histogram.
+
+    Args:
+        name (str): Histogram name
+        value (float): Observed value
+        buckets (tuple): Upper bounds of the histogram buckets
+        **labels: Label values, e.g. stage="network"
+    """
+    if not METRICS_CONFIG["enabled"]:
+        return
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    bucket = bisect.bisect_left(buckets, value)
+    with _METRICS_LOCK:
+        histogram = METRICS["histograms"].get(key)
+        if histogram is None:
+            histogram = {"buckets": buckets, "counts": [0] * (len(buckets) + 1), "sum": 0.0, "count": 0}
+            METRICS["histograms"][key] = histogram
+        histogram["counts"][bucket] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+class _StageTimer:
+    """
+    Context manager that records how long a stage took.
+    """
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_metric("stage_latency_seconds", time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+
+def measure_stage(stage):
+    """
+    Time a block of code as a named stage.
+
+    Usage:
+        with measure_stage("json_decode"):
+            data = response.json()
+
+    Args:
+        stage (str): Stage name (network, json_decode, aggregation, response, render, ...)
+    """
+    if not METRICS_CONFIG["enabled"]:
+        return _NULL_STAGE
+    return _StageTimer(stage)
+
+
+def timed_stage(stage):
+    """
+    Decorator that times every call of a function as a named stage.
+
+    Args:
+        stage (str): Stage name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS_CONFIG["enabled"]:
+                return func(*args, **kwargs)
+            with _StageTimer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def export_metrics(output_format="prometheus"):
+    """
+    Export recorded metrics.
+
+    Args:
+        output_format (str): Either 'prometheus' for the Prometheus text format or 'json'
+
+    Returns:
+        str: The formatted metrics
+    """
+    # Take a consistent snapshot so fetch threads can keep recording meanwhile
+    with _METRICS_LOCK:
+        counters = sorted(METRICS["counters"].items())
+        histograms = sorted((key, dict(h, counts=list(h["counts"])))
+                            for key, h in METRICS["histograms"].items())
+
+    if output_format == "json":
+        return json.dumps({
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in counters
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), "buckets": list(h["buckets"]),
+                 "counts": h["counts"], "sum": h["sum"], "count": h["count"]}
+                for (name, labels), h in histograms
+            ]
+        }, indent=2)
+
+    if output_format != "prometheus":
+        raise ValueError(f"Unknown metrics format: {output_format}")
+
+    lines = []
+    seen_types = set()
+    for (name, labels), value in counters:
+        metric = f"weather_{name}_total"
+        if metric not in seen_types:
+            lines.append(f"# TYPE {metric} counter")
+            seen_types.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    for (name, labels), h in histograms:
+        metric = f"weather_{name}"
+        if metric not in seen_types:
+            lines.append(f"# TYPE {metric} histogram")
+            seen_types.add(metric)
+        cumulative = 0
+        for bound, count in zip(h["buckets"], h["counts"]):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {h['count']}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {h['sum']}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {h['count']}")
+
+    return "\n".join(lines) + "\n"
+
+# Transport configuration
+# mode is one of "live" (real API), "record" (real API, responses saved to cassettes),
+# "replay" (responses served from cassettes on disk) or "stub" (requests sent to a
+# local stub server started with start_stub_server)
+TRANSPORT_CONFIG = {
+    "mode": "live",
+    "cassette_dir": "cassettes",
+    "latency": 0.0,          # Seconds of injected latency per replayed request
+    "latency_jitter": 0.0,   # Extra random latency of up to this many seconds
+    "error_rate": 0.0,       # Fraction of replayed requests that fail
+    "error_status": 503,     # Status code used for injected failures
+    "seed": None,            # Seed for repeatable latency/error injection
+    "stub_url": None         # Base URL of the running stub server
+}
+
+_transport_random = random.Random()
+
+
+class CassetteResponse:
+    """
+    Minimal stand-in for requests.Response used when replaying cassettes.
+    """
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self._content = None
+
+    @property
+    def content(self):
+        # Only needed for payload metrics, so serialise the body on first use
+        if self._content is None:
+            self._content = json.dumps(self._body).encode("utf-8")
+        return self._content
+
+    def json(self):
+        return self._body
+
+
+def configure_transport(mode="live", **options):
+    """
+    Select how get_weather_data talks to the weather API.
+
+    Args:
+        mode (str): "live", "record", "replay" or "stub"
+        **options: Any other TRANSPORT_CONFIG key (cassette_dir, latency, error_rate, ...)
+
+    Returns:
+        dict: The updated transport configuration
+    """
+    if mode not in ("live", "record", "replay", "stub"):
+        raise ValueError(f"Unknown transport mode: {mode}")
+
+    for key in options:
+        if key not in TRANSPORT_CONFIG:
+            raise ValueError(f"Unknown transport option: {key}")
+
+    TRANSPORT_CONFIG["mode"] = mode
+    TRANSPORT_CONFIG.update(options)
+    _transport_random.seed(TRANSPORT_CONFIG["seed"])
+    return TRANSPORT_CONFIG
+
+
+def cassette_path(url, cassette_dir=None):
+    """
+    Work out the cassette file that stores the response for a request URL.
+    The API key is left out so cassettes can be shared without leaking it.
+
+    Args:
+        url (str): Full request URL (or just the path and query string)
+        cassette_dir (str): Directory holding cassettes (defaults to the configured one)
+
+    Returns:
+        str: Path of the cassette file
+    """
+    cassette_dir = cassette_dir or TRANSPORT_CONFIG["cassette_dir"]
+    parts = urlsplit(url)
+    endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1] or "root"
+    query = sorted((k, v.lower()) for k, v in parse_qsl(parts.query) if k != "appid")
+    key = urlencode(query)
+    slug = re.sub(r"[^a-z0-9]+", "-", dict(query).get("q", "")).strip("-")[:40]
+    digest = hashlib.sha1(f"{endpoint}?{key}".encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cassette_dir, f"{endpoint}_{slug}_{digest}.json")
+
+
+def _inject_faults():
+    """
+    Sleep for the configured latency and decide whether this request should fail.
+
+    Returns:
+        bool: True if an error should be injected
+    """
+    delay = TRANSPORT_CONFIG["latency"]
+    if TRANSPORT_CONFIG["latency_jitter"]:
+        delay += _transport_random.uniform(0, TRANSPORT_CONFIG["latency_jitter"])
+    if delay > 0:
+        time.sleep(delay)
+    return _transport_random.random() < TRANSPORT_CONFIG["error_rate"]
+
+
+def _replay_response(url):
+    """
+    Load a response from its cassette, applying injected latency and errors.
+    """
+    if _inject_faults():
+        status = TRANSPORT_CONFIG["error_status"]
+        return CassetteResponse(status, {"cod": status, "message": "injected error"})
+
+    path = cassette_path(url)
+    if not os.path.exists(path):
+        return CassetteResponse(404, {"cod": "404", "message": "no cassette recorded"})
+
+    with open(path, encoding="utf-8") as f:
+        cassette = json.load(f)
+    return CassetteResponse(cassette["status_code"], cassette["body"])
+
+
+def transport_get(url):
+    """
+    Send a GET request through the configured transport.
+
+    Args:
+        url (str): Full request URL built from BASE_URL
+
+    Returns:
+        Response object with status_code and json() like requests.Response
+    """
+    mode = TRANSPORT_CONFIG["mode"]
+    endpoint = urlsplit(url).path.rsplit("/", 1)[-1]
+    count_metric("api_calls", endpoint=endpoint)
+
+    with measure_stage("network"):
+        if mode == "replay":
+            response = _replay_response(url)
+        else:
+            if mode == "stub":
+                if not TRANSPORT_CONFIG["stub_url"]:
+                    raise requests.ConnectionError("Stub server is not running")
+                url = TRANSPORT_CONFIG["stub_url"] + url[len(BASE_URL):]
+            response = requests.get(url)
+
+    if METRICS_CONFIG["enabled"]:
+        observe_metric("payload_bytes", len(response.content), PAYLOAD_BUCKETS, endpoint=endpoint)
+        if response.status_code != 200:
+            count_metric("api_errors", status=response.status_code)
+
+    if mode == "record":
+        path = cassette_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"cod": response.status_code, "message": response.text}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"url": re.sub(r"appid=[^&]*", "appid=REDACTED", url),
+                       "status_code": response.status_code, "body": body}, f)
+
+    return response
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve recorded cassettes over HTTP, mimicking the OpenWeatherMap endpoints.
+    """
+
+    def do_GET(self):
+        response = _replay_response(self.path)
+        self.send_response(response.status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response.content)))
+        self.end_headers()
+        self.wfile.write(response.content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host="127.0.0.1", port=0, **options):
+    """
+    Start a local HTTP server that serves cassettes in a background thread and
+    switch the transport to "stub" mode so requests go through it.
+
+    Args:
+        host (str): Interface to bind to
+        port (int): Port to listen on (0 picks a free port)
+        **options: Transport options for the server (cassette_dir, latency, error_rate, ...)
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() to stop it)
+    """
+    configure_transport("stub", **options)
+    server = ThreadingHTTPServer((host, port), _StubRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    TRANSPORT_CONFIG["stub_url"] = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    return server
+
+# Forecast processing configuration
+# With lazy_hourly on, daily summaries keep only their aggregates and a reference into
+# a compact column buffer of the raw readings; the "hourly" list is built on first access
+FORECAST_CONFIG = {
+    "lazy_hourly": False,
+    "cache_hourly": True   # Keep hourly records once built (evict_hourly drops them again)
+}
+
+def _hourly_record(item, dt=None):
+    """
+    Convert one 3-hourly reading from the forecast API into an hourly record.
+    """
+    dt = dt or datetime.fromtimestamp(item["dt"])
+    return {
+        "timestamp": dt.strftime('%Y-%m-%d %H:%M:%S'),
+        "temperature": item["main"]["temp"],
+        "feels_like": item["main"]["feels_like"],
+        "humidity": item["main"]["humidity"],
+        "pressure": item["main"]["pressure"],
+        "description": item["weather"][0]["description"],
+        "main": item["weather"][0]["main"],
+        "icon": item["weather"][0]["icon"],
+        "clouds": item["clouds"]["all"],
+        "wind": {
+            "speed": item["wind"]["speed"],
+            "direction": item["wind"].get("deg", 0)
+        },
+        "pop": item.get("pop", 0) * 100,  # Probability of precipitation as percentage
+        "rain": item.get("rain", {}).get("3h", 0),
+        "snow": item.get("snow", {}).get("3h", 0),
+        "hour": dt.hour
+    }
+
+
+class HourlyBuffer:
+    """
+    Compact column store for the 3-hourly readings of one forecast.
+    Numbers are kept in NumPy arrays and weather descriptions in a small lookup
+    table, instead of one dictionary per reading.
+    """
+
+    __slots__ = ("columns", "int_rows", "weather_codes", "weather_table")
+
+    # column name -> function reading it from a raw API item
+    FIELDS = {
+        "dt": lambda item: item["dt"],
+        "temperature": lambda item: item["main"]["temp"],
+        "feels_like": lambda item: item["main"]["feels_like"],
+        "humidity": lambda item: item["main"]["humidity"],
+        "pressure": lambda item: item["main"]["pressure"],
+        "clouds": lambda item: item["clouds"]["all"],
+        "wind_speed": lambda item: item["wind"]["speed"],
+        "wind_direction": lambda item: item["wind"].get("deg", 0),
+        "pop": lambda item: item.get("pop", 0) * 100,
+        "rain": lambda item: item.get("rain", {}).get("3h", 0),
+        "snow": lambda item: item.get("snow", {}).get("3h", 0)
+    }
+
+    def __init__(self, items):
+        self.columns = {}
+        self.int_rows = {}  # column name -> mask of int readings, for columns mixing ints and floats
+        for name, get_value in self.FIELDS.items():
+            values = [get_value(item) for item in items]
+            is_int = [isinstance(v, int) for v in values]
+            # Keep whole-number columns as integers so records match the eager ones
+            if all(is_int):
+                self.columns[name] = np.array(values, dtype=np.int64)
+            else:
+                self.columns[name] = np.array(values, dtype=np.float64)
+                if any(is_int):
+                    # e.g. "rain" is 0 when the API leaves it out and a float otherwise
+                    self.int_rows[name] = np.array(is_int, dtype=bool)
+        
+        weather_index = {}
+        codes = []
+        for item in items:
+            weather = item["weather"][0]
+            key = (weather["description"], weather["main"], weather["icon"])
+            codes.append(weather_index.setdefault(key, len(weather_index)))
+        self.weather_codes = np.array(codes, dtype=np.int16)
+        self.weather_table = list(weather_index)
+
+    @classmethod
+    def from_columns(cls, columns, int_rows, weather_codes, weather_table):
+        """
+        Wrap columns that were already built, e.g. by decode_report.
+        """
+        buffer = cls.__new__(cls)
+        buffer.columns = columns
+        buffer.int_rows = int_rows
+        buffer.weather_codes = weather_codes
+        buffer.weather_table = weather_table
+        return buffer
+
+    def records(self, start, stop):
+        """
+        Build hourly records (the same format as the eager "hourly" list) for a slice of readings.
+        """
+        columns = {name: column[start:stop].tolist() for name, column in self.columns.items()}
+        for name, mask in self.int_rows.items():
+            columns[name] = [int(v) if is_int else v
+                             for v, is_int in zip(columns[name], mask[start:stop].tolist())]
+        records = []
+        for i, code in enumerate(self.weather_codes[start:stop].tolist()):
+            dt = datetime.fromtimestamp(columns["dt"][i])
+            description, main, icon = self.weather_table[code]
+            records.append({
+                "timestamp": dt.strftime('%Y-%m-%d %H:%M:%S'),
+                "temperature": columns["temperature"][i],
+                "feels_like": columns["feels_like"][i],
+                "humidity": columns["humidity"][i],
+                "pressure": columns["pressure"][i],
+                "description": description,
+                "main": main,
+                "icon": icon,
+                "clouds": columns["clouds"][i],
+                "wind": {
+                    "speed": columns["wind_speed"][i],
+                    "direction": columns["wind_direction"][i]
+                },
+                "pop": columns["pop"][i],
+                "rain": columns["rain"][i],
+                "snow": columns["snow"][i],
+                "hour": dt.hour
+            })
+        return records
+
+
+class DailySummary(dict):
+    """
+    A daily summary dictionary whose "hourly" list is built from an HourlyBuffer
+    the first time it is read with day["hourly"] or day.get("hourly").
+    
+    Until then "hourly" is not a key: "in", keys(), len(), dict(day), copy.deepcopy
+    and json.dumps all leave it out. Serialise or copy reports with plain_report,
+    which builds every hourly list; passing a lazy report straight to json.dumps
+    is not supported.
+    """
+
+    __slots__ = ("_buffer", "_start", "_stop")
+
+    def __init__(self, data, buffer, start, stop):
+        super().__init__(data)
+        self._buffer = buffer
+        self._start = start
+        self._stop = stop
+
+    def __missing__(self, key):
+        if key != "hourly":
+            raise KeyError(key)
+        hourly = self._buffer.records(self._start, self._stop)
+        if FORECAST_CONFIG["cache_hourly"]:
+            self["hourly"] = hourly
+        return hourly
+
+    def get(self, key, default=None):
+        if key == "hourly":
+            return self[key]
+        return super().get(key, default)
+
+    def evict_hourly(self):
+        """
+        Drop the built hourly records; they are rebuilt if read again.
+        """
+        self.pop("hourly", None)
+
+class ForecastDays(list):
+    """
+    The list of daily summaries in a report. It behaves (and serialises) like a
+    plain list, and also holds the report's WindowIndex once get_window_index has
+    built it, so the index lives exactly as long as the report.
+    """
+
+    __slots__ = ("window_index",)
+
+    def __init__(self, days=()):
+        super().__init__(days)
+        self.window_index = None
+
+def evict_hourly(weather_data):
+    """
+    Free the hourly records built so far in a report that was processed with lazy_hourly.
+    
+    Args:
+        weather_data (dict): The processed weather data
+    """
+    for day in weather_data.get("forecast", []):
+        if isinstance(day, DailySummary):
+            day.evict_hourly()
+
+def hourly_columns(weather_data, fields=()):
+    """
+    Read a report's hourly readings as NumPy columns.
+    
+    Days processed with lazy_hourly are read straight from their HourlyBuffer, so
+    no hourly records are built; other days are read from their hourly lists.
+    
+    Args:
+        weather_data (dict): The processed weather data
+        fields (list): Keys of TIMESERIES_FIELDS to read
+        
+    Returns:
+        tuple: (times, values) in reading order, with times in seconds since the
+            epoch and values a dict of field -> array
+    """
+    times = []
+    values = {field: [] for field in fields}
+    for day in weather_data.get("forecast", []):
+        if isinstance(day, DailySummary):
+            columns, start, stop = day._buffer.columns, day._start, day._stop
+            times.append(columns["dt"][start:stop].astype(float))
+            for field in fields:
+                values[field].append(columns[field][start:stop].astype(float))
+        else:
+            hourly = day["hourly"]
+            times.append(np.array([datetime.fromisoformat(h["timestamp"]).timestamp() for h in hourly], dtype=float))
+            for field in fields:
+                get_value = TIMESERIES_FIELDS[field][1]
+                values[field].append(np.array([get_value(h) for h in hourly], dtype=float))
+    
+    def join(parts):
+        return np.concatenate(parts) if parts else np.array([], dtype=float)
+    
+    return join(times), {field: join(parts) for field, parts in values.items()}
+
+@timed_stage("aggregation")
+def summarise_forecast(forecast_list, forecast_days=5, lazy_hourly=None):
+    """
+    Group 3-hourly forecast readings by day and calculate daily statistics.
+    
+    Args:
+        forecast_list (list): The "list" entries from the forecast API response
+        forecast_days (int): Number of days to keep
+        lazy_hourly (bool): Build hourly records only when they are read
+            (defaults to FORECAST_CONFIG["lazy_hourly"])
+        
+    Returns:
+        list: Daily summaries with min/max/avg values and the hourly readings
+    """
+    if lazy_hourly is None:
+        lazy_hourly = FORECAST_CONFIG["lazy_hourly"]
+    
+    # Group forecast by day
+    daily_forecasts = {}
+    today = datetime.now().date()
+    
+    for item in forecast_list:
+        dt = datetime.fromtimestamp(item["dt"])
+        day = dt.date()
+    
+        if (day - today).days >= forecast_days:
+            continue
+    
+        if day not in daily_forecasts:
+            daily_forecasts[day] = []
+    
+        daily_forecasts[day].append((dt, item))
+    
+    days = sorted(daily_forecasts.items())
+    if lazy_hourly:
+        buffer = HourlyBuffer([item for _, readings in days for _, item in readings])
+    position = 0
+    
+    # Calculate daily stats
+    daily_summaries = []
+    for day, readings in days:
+        items = [item for _, item in readings]
+        daily_temps = [item["main"]["temp"] for item in items]
+        daily_humidity = [item["main"]["humidity"] for item in items]
+        daily_clouds = [item["clouds"]["all"] for item in items]
+        daily_pop = [item.get("pop", 0) * 100 for item in items]
+        daily_rain = [item.get("rain", {}).get("3h", 0) for item in items]
+    
+        daily_summary = {
+            "date": day.strftime('%Y-%m-%d'),
+            "day_name": day.strftime('%A'),
+            "temperature": {
+                "min": min(daily_temps),
+                "max": max(daily_temps),
+                "avg": sum(daily_temps) / len(daily_temps)
+            },
+            "humidity": {
+                "min": min(daily_humidity),
+                "max": max(daily_humidity),
+                "avg": sum(daily_humidity) / len(daily_humidity)
+            },
+            "clouds": {
+                "min": min(daily_clouds),
+                "max": max(daily_clouds),
+                "avg": sum(daily_clouds) / len(daily_clouds)
+            },
+            "precipitation_chance": max(daily_pop)
+        }
+    
+        if daily_rain:
+            daily_summary["rain"] = {
+                "total": sum(daily_rain),
+                "max": max(daily_rain)
+            }
+    
+        if lazy_hourly:
+            daily_summary = DailySummary(daily_summary, buffer, position, position + len(items))
+        else:
+            daily_summary["hourly"] = [_hourly_record(item, dt) for dt, item in readings]
+        position += len(items)
+    
+        daily_summaries.append(daily_summary)
+    
+    return ForecastDays(daily_summaries)
+
+def get_weather_data(location, forecast_days=5, coordinates=None):
     """
     Retrieve weather data for a specified location.
     
     Args:
         location (str): City or location name
         forecast_days (int): Number of days to forecast (1-5)
+        coordinates (tuple): Optional (lat, lon) to look up instead of the location name
         
     Returns:
         dict: Weather data including current conditions and forecast
@@ -38,10 +774,15 @@ def get_weather_data(location, forecast_days=5):
     # Ensure forecast days is within acceptable range
     forecast_days = max(1, min(forecast_days, 5))
     
+    if coordinates is not None:
+        query = f"lat={coordinates[0]}&lon={coordinates[1]}"
+    else:
+        query = f"q={location}"
+    
     try:
         # Get current weather
-        current_url = f"{BASE_URL}/weather?q={location}&units=metric&appid={API_KEY}"
-        current_response = requests.get(current_url)
+        current_url = f"{BASE_URL}/weather?{query}&units=metric&appid={API_KEY}"
+        current_response = transport_get(current_url)
         
         if current_response.status_code != 200:
             if current_response.status_code == 404:
@@ -49,16 +790,18 @@ def get_weather_data(location, forecast_days=5):
             else:
                 return {"error": f"API Error: {current_response.status_code}"}
         
-        current_data = current_response.json()
+        with measure_stage("json_decode"):
+            current_data = current_response.json()
         
         # Get forecast data
-        forecast_url = f"{BASE_URL}/forecast?q={location}&units=metric&appid={API_KEY}"
-        forecast_response = requests.get(forecast_url)
+        forecast_url = f"{BASE_URL}/forecast?{query}&units=metric&appid={API_KEY}"
+        forecast_response = transport_get(forecast_url)
         
         if forecast_response.status_code != 200:
             return {"error": f"Forecast API Error: {forecast_response.status_code}"}
         
-        forecast_data = forecast_response.json()
+        with measure_stage("json_decode"):
+            forecast_data = forecast_response.json()
         
         # Process and structure the data
         processed_data = {
@@ -90,86 +833,162 @@ def get_weather_data(location, forecast_days=5):
             "forecast": []
         }
         
-        # Group forecast by day
-        daily_forecasts = {}
-        today = datetime.now().date()
-        
-        for item in forecast_data["list"]:
-            dt = datetime.fromtimestamp(item["dt"])
-            day = dt.date()
-            
-            if (day - today).days >= forecast_days:
-                continue
-                
-            if day not in daily_forecasts:
-                daily_forecasts[day] = []
-                
-            daily_forecasts[day].append({
-                "timestamp": dt.strftime('%Y-%m-%d %H:%M:%S'),
-                "temperature": item["main"]["temp"],
-                "feels_like": item["main"]["feels_like"],
-                "humidity": item["main"]["humidity"],
-                "pressure": item["main"]["pressure"],
-                "description": item["weather"][0]["description"],
-                "main": item["weather"][0]["main"],
-                "icon": item["weather"][0]["icon"],
-                "clouds": item["clouds"]["all"],
-                "wind": {
-                    "speed": item["wind"]["speed"],
-                    "direction": item["wind"].get("deg", 0)
-                },
-                "pop": item.get("pop", 0) * 100,  # Probability of precipitation as percentage
-                "rain": item.get("rain", {}).get("3h", 0),
-                "snow": item.get("snow", {}).get("3h", 0),
-                "hour": dt.hour
-            })
-        
-        # Calculate daily stats and add to processed data
-        for day, forecasts in sorted(daily_forecasts.items()):
-            daily_temps = [f["temperature"] for f in forecasts]
-            daily_humidity = [f["humidity"] for f in forecasts]
-            daily_clouds = [f["clouds"] for f in forecasts]
-            daily_pop = [f["pop"] for f in forecasts]
-            
-            # Check if we have rain data
-            daily_rain = [f["rain"] for f in forecasts if "rain" in f]
-            
-            daily_summary = {
-                "date": day.strftime('%Y-%m-%d'),
-                "day_name": day.strftime('%A'),
-                "temperature": {
-                    "min": min(daily_temps),
-                    "max": max(daily_temps),
-                    "avg": sum(daily_temps) / len(daily_temps)
-                },
-                "humidity": {
-                    "min": min(daily_humidity),
-                    "max": max(daily_humidity),
-                    "avg": sum(daily_humidity) / len(daily_humidity)
-                },
-                "clouds": {
-                    "min": min(daily_clouds),
-                    "max": max(daily_clouds),
-                    "avg": sum(daily_clouds) / len(daily_clouds)
-                },
-                "precipitation_chance": max(daily_pop),
-                "hourly": forecasts
-            }
-            
-            if daily_rain:
-                daily_summary["rain"] = {
-                    "total": sum(daily_rain),
-                    "max": max(daily_rain)
-                }
-                
-            processed_data["forecast"].append(daily_summary)
+        processed_data["forecast"] = summarise_forecast(forecast_data["list"], forecast_days)
             
         return processed_data
     except requests.RequestException as e:
+        count_metric("api_errors", status="network")
         return {"error": f"Network error: {str(e)}"}
     except Exception as e:
         return {"error": f"Error processing weather data: {str(e)}"}
 
+# Time windows for questions such as "next 6 hours" or "Thursday afternoon"
+WINDOW_FIELDS = ["temperature", "pop", "rain", "wind_speed", "humidity"]
+
+FORECAST_STEP = 3 * 3600  # Seconds covered by each forecast reading
+
+PARTS_OF_DAY = {
+    "morning": (6, 12),
+    "afternoon": (12, 18),
+    "evening": (18, 22),
+    "night": (22, 30)   # Runs on to 6am the next day
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+class WindowIndex:
+    """
+    Prefix sums and sparse tables over a report's hourly readings, so the
+    min, max, sum or mean of a field over any time window takes constant time
+    once the window's readings have been located.
+    """
+
+    def __init__(self, weather_data, fields=WINDOW_FIELDS):
+        # Lazy reports are read from their HourlyBuffer without building hourly records
+        self.times, columns = hourly_columns(weather_data, fields)
+        self.prefix = {}
+        self.sparse_min = {}
+        self.sparse_max = {}
+        for field, values in columns.items():
+            self.prefix[field] = np.concatenate([[0.0], np.cumsum(values)])
+            self.sparse_min[field] = self._sparse_table(values, np.minimum)
+            self.sparse_max[field] = self._sparse_table(values, np.maximum)
+
+    @staticmethod
+    def _sparse_table(values, combine):
+        # Level k holds the result for every run of 2**k readings
+        levels = [values]
+        width = 1
+        while width * 2 <= len(values):
+            previous = levels[-1]
+            levels.append(combine(previous[:-width], previous[width:]))
+            width *= 2
+        return levels
+
+    def locate(self, start, end):
+        """
+        Return the [first, last) positions of readings whose 3-hour period overlaps [start, end).
+        """
+        first = int(np.searchsorted(self.times, start - FORECAST_STEP, side="right"))
+        last = int(np.searchsorted(self.times, end, side="left"))
+        return first, max(first, last)
+
+    def query(self, field, start, end, how="mean"):
+        """
+        Aggregate a field over a time window.
+        
+        Args:
+            field (str): One of the indexed fields
+            start (float): Window start in seconds since the epoch
+            end (float): Window end (exclusive)
+            how (str): 'min', 'max', 'sum', 'mean' or 'count'
+            
+        Returns:
+            float: The aggregate, or None if no readings fall in the window
+        """
+        first, last = self.locate(start, end)
+        count = last - first
+        if how == "count":
+            return count
+        if count == 0:
+            return None
+        if how in ("sum", "mean"):
+            total = self.prefix[field][last] - self.prefix[field][first]
+            return float(total if how == "sum" else total / count)
+        if how in ("min", "max"):
+            table = self.sparse_min[field] if how == "min" else self.sparse_max[field]
+            level = count.bit_length() - 1
+            combine = min if how == "min" else max
+            return float(combine(table[level][first], table[level][last - (1 << level)]))
+        raise ValueError(f"Unknown aggregation: {how}")
+
+def get_window_index(weather_data):
+    """
+    Return the WindowIndex for a report, building it the first time.
+    
+    The index is kept on the report's ForecastDays list, so every later window
+    question on the report (or on a copy sharing its forecast, like TileCache
+    answers) reuses it. Reports whose forecast is a plain list, e.g. a copy made
+    with plain_report, get a fresh index.
+    """
+    forecast = weather_data.get("forecast", [])
+    if not isinstance(forecast, ForecastDays):
+        return WindowIndex(weather_data)
+    if forecast.window_index is None:
+        forecast.window_index = WindowIndex(weather_data)
+    return forecast.window_index
+
+def parse_time_window(question, now=None):
+    """
+    Find a time window such as "next 6 hours", "tonight" or "thursday afternoon" in a question.
+    
+    Args:
+        question (str): Lower-case question text
+        now (datetime): Current time (defaults to datetime.now())
+        
+    Returns:
+        tuple: (window dict with start, end and label, matched text) or (None, None)
+    """
+    now = now or datetime.now()
+    
+    match = re.search(r"(?:in |over |for |during )?(?:the )?next (?:(\d+|an?|one) ?)?(hours?|hrs?|h)\b", question)
+    if match:
+        amount = match.group(1)
+        hours = int(amount) if amount and amount.isdigit() else 1
+        label = "the next hour" if hours == 1 else f"the next {hours} hours"
+        return {"start": now.timestamp(), "end": (now + timedelta(hours=hours)).timestamp(),
+                "label": label}, match.group(0)
+    
+    match = re.search(r"(?:\b(?:on|next|this|for|during) )?\b(this|tomorrow|" + "|".join(WEEKDAYS) +
+                      r") (morning|afternoon|evening|night)\b|\btonight\b", question)
+    if not match:
+        return None, None
+    
+    text = match.group(0)
+    when, part = match.group(1), match.group(2)
+    if when is None:  # Tonight
+        day_offset, part = 0, "night"
+    elif when == "this":
+        day_offset = 0
+    elif when == "tomorrow":
+        day_offset = 1
+    else:
+        day_offset = (WEEKDAYS.index(when) - now.weekday()) % 7
+    
+    day = datetime.combine(now.date() + timedelta(days=day_offset), datetime.min.time())
+    first_hour, last_hour = PARTS_OF_DAY[part]
+    start = day + timedelta(hours=first_hour)
+    end = day + timedelta(hours=last_hour)
+    
+    if day_offset == 0:
+        label = "tonight" if part == "night" else f"this {part}"
+    elif day_offset == 1:
+        label = f"tomorrow {part}"
+    else:
+        label = f"{day.strftime('%A')} {part}"
+    return {"start": max(start, now).timestamp() if day_offset == 0 else start.timestamp(),
+            "end": end.timestamp(), "label": label}, text
+
 def parse_weather_question(question):
     """
     Parse a natural language weather question.
@@ -191,17 +1010,22 @@ def parse_weather_question(question):
         "original_question": question
     }
     
+    # Find time windows first and leave them out of the text searched for a
+    # location, so "in the next 6 hours" isn't mistaken for a place
+    window, window_text = parse_time_window(question)
+    location_text = question.replace(window_text, " ").strip() if window_text else question
+    
     # Extract location - attempt to find city names
     # This is a simple approach - a more robust solution would use NER
     # Look for common patterns like "in [location]", "for [location]", etc.
     location_patterns = [
-        r"(?:in|at|for|of|about) ([\w\s]+?)(?:$|\?|\.|\s(?:today|tomorrow|this|next|on))",
+        r"\b(?:in|at|for|of|about) ([\w\s]+?)(?:$|\?|\.|\s(?:today|tomorrow|this|next|on))",
         r"([\w\s]+?)(?:'s|\s+weather)",
         r"(?:^|\s)([\w\s]+?)(?:$|\?|\.|weather)"
     ]
     
     for pattern in location_patterns:
-        match = re.search(pattern, question)
+        match = re.search(pattern, location_text)
         if match:
             potential_location = match.group(1).strip()
             # Filter out common words that might be mistaken for locations
@@ -232,6 +1056,11 @@ def parse_weather_question(question):
     # Extract date references (July 15, 2023-07-15, etc.)
     # This would need more complex parsing in a production system
         
+    # Time windows are more specific than any of the periods above
+    if window:
+        result["time_period"] = "window"
+        result["window"] = window
+        
     # Extract weather attributes
     weather_attributes = {
         "temperature": ["temperature", "temp", "hot", "cold", "warm", "chilly", "degrees", "°c", "°f", "celsius", "fahrenheit"],
@@ -251,6 +1080,7 @@ def parse_weather_question(question):
     
     return result
 
+@timed_stage("response")
 def generate_weather_response(parsed_question, weather_data):
     """
     Generate a natural language response to a weather question.
@@ -481,10 +1311,53 @@ def generate_weather_response(parsed_question, weather_data):
             return (f"On {target_day} in {full_location}, expect temperatures between "
                    f"{specific_forecast['temperature']['min']:.1f}°C and {specific_forecast['temperature']['max']:.1f}°C.")
     
-    # Fallback response
-    return (f"Based on current data for {full_location}, the temperature is {weather_data['current']['temperature']}°C "
+    # Handle time windows ("next 6 hours", "thursday afternoon", ...)
+    elif time_period == "window" and "window" in parsed_question and weather_data["forecast"]:
+        window = parsed_question["window"]
+        index = get_window_index(weather_data)
+        start, end, label = window["start"], window["end"], window["label"]
+        
+        if not index.query("temperature", start, end, "count"):
+            return f"I don't have forecast data for {label} in {full_location}."
+        
+        temp_min = index.query("temperature", start, end, "min")
+        temp_max = index.query("temperature", start, end, "max")
+        pop_max = index.query("pop", start, end, "max")
+        
+        if attribute == "temperature":
+            return (f"Over {label} in {full_location}, temperatures will range from "
+                   f"{temp_min:.1f}°C to {temp_max:.1f}°C, averaging "
+                   f"{index.query('temperature', start, end, 'mean'):.1f}°C.")
+        
+        elif attribute == "precipitation":
+            rain_total = index.query("rain", start, end, "sum")
+            if rain_total > 0:
+                return (f"Over {label} in {full_location}, expect about {rain_total:.1f} mm of rain, "
+                       f"with up to a {pop_max:.0f}% chance of precipitation.")
+            else:
+                return (f"Over {label} in {full_location}, there's up to a {pop_max:.0f}% "
+                       f"chance of precipitation.")
+        
+        elif attribute == "wind":
+            return (f"Over {label} in {full_location}, wind speeds will be between "
+                   f"{index.query('wind_speed', start, end, 'min'):.1f} and "
+                   f"{index.query('wind_speed', start, end, 'max'):.1f} m/s.")
+        
+        elif attribute == "humidity":
+            return (f"Over {label} in {full_location}, humidity will range from "
+                   f"{index.query('humidity', start, end, 'min'):.0f}% to "
+                   f"{index.query('humidity', start, end, 'max'):.0f}%, with an average of "
+                   f"{index.query('humidity', start, end, 'mean'):.0f}%.")
+        
+        else:
+            return (f"Over {label} in {full_location}, expect temperatures between "
+                   f"{temp_min:.1f}°C and {temp_max:.1f}°C with up to a {pop_max:.0f}% chance of precipitation.")
+    
+    # Fallback response
+    return (f"Based on current data for {full_location}, the temperature is {weather_data['current']['temperature']}°C "
            f"with {weather_data['current']['description']}.")
 
+@timed_stage("render")
 def create_temperature_visualisation(weather_data, output_type='display'):
     """
     Create visualisation of temperature data.
@@ -566,6 +1439,7 @@ def create_temperature_visualisation(weather_data, output_type='display'):
         plt.show()
         plt.close()
 
+@timed_stage("render")
 def create_precipitation_visualisation(weather_data, output_type='display'):
     """
     Create visualisation of precipitation data.
@@ -651,6 +1525,7 @@ def create_precipitation_visualisation(weather_data, output_type='display'):
     else:
         plt.show()
         plt.close()
+@timed_stage("render")
 def create_wind_visualisation(weather_data, output_type='display'):
     """
     Create visualisation of wind data.
@@ -726,71 +1601,501 @@ def create_wind_visualisation(weather_data, output_type='display'):
         plt.show()
         plt.close()
 
-def display_current_weather(weather_data):
+# Hourly fields that can be plotted as a time series
+TIMESERIES_FIELDS = {
+    "temperature": ("Temperature (°C)", lambda h: h["temperature"]),
+    "feels_like": ("Feels Like (°C)", lambda h: h["feels_like"]),
+    "humidity": ("Humidity (%)", lambda h: h["humidity"]),
+    "pressure": ("Pressure (hPa)", lambda h: h["pressure"]),
+    "clouds": ("Cloud Cover (%)", lambda h: h["clouds"]),
+    "pop": ("Precipitation Chance (%)", lambda h: h["pop"]),
+    "rain": ("Rainfall (mm / 3h)", lambda h: h.get("rain", 0)),
+    "snow": ("Snowfall (mm / 3h)", lambda h: h.get("snow", 0)),
+    "wind_speed": ("Wind Speed (m/s)", lambda h: h["wind"]["speed"]),
+    "wind_direction": ("Wind Direction (°)", lambda h: h["wind"]["direction"])
+}
+
+def extract_hourly_series(weather_data, field="temperature"):
     """
-    Display current weather information in a formatted text output.
+    Collect one hourly field from one or more weather reports as a time series.
+    When several reports (e.g. stored history) cover the same time, the value from
+    the later report in the list is kept.
+    
+    Args:
+        weather_data (dict or list): A processed weather report or a list of them
+        field (str): One of the keys in TIMESERIES_FIELDS
+        
+    Returns:
+        tuple: (times, values) as NumPy arrays, times in seconds since the epoch
+    """
+    if field not in TIMESERIES_FIELDS:
+        raise ValueError(f"Unknown time series field: {field}")
+    
+    reports = [weather_data] if isinstance(weather_data, dict) else weather_data
+    get_value = TIMESERIES_FIELDS[field][1]
+    points = {}
+    
+    for report in reports:
+        if "error" in report:
+            continue
+        for day in report["forecast"]:
+            for hour_data in day["hourly"]:
+                dt = datetime.strptime(hour_data["timestamp"], '%Y-%m-%d %H:%M:%S')
+                points[dt.timestamp()] = get_value(hour_data)
+    
+    times = np.array(sorted(points), dtype=float)
+    values = np.array([points[t] for t in times], dtype=float)
+    return times, values
+
+def downsample_lttb(x, y, threshold):
+    """
+    Reduce a series to a fixed number of points with the Largest-Triangle-Three-Buckets
+    algorithm, which keeps the visual shape (peaks and troughs) of the line.
+    
+    Args:
+        x (array): X values in ascending order
+        y (array): Y values
+        threshold (int): Number of points to keep
+        
+    Returns:
+        tuple: (x, y) arrays with at most threshold points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    
+    # Bucket boundaries; the first and last points are always kept
+    every = (n - 2) / (threshold - 2)
+    edges = np.floor(np.arange(threshold - 1) * every).astype(int) + 1
+    
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Area of the triangle between the last kept point, each candidate and the
+        # average of the next bucket (the constant factor 1/2 is left out)
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                       (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    
+    return x[selected], y[selected]
+
+def downsample_minmax(x, y, max_points):
+    """
+    Reduce a series by keeping the minimum and maximum point of each bucket, so no
+    spike is lost. Fully vectorised, which makes it faster than LTTB on very long series.
+    
+    Args:
+        x (array): X values in ascending order
+        y (array): Y values
+        max_points (int): Upper limit on the number of points kept
+        
+    Returns:
+        tuple: (x, y) arrays with at most max_points points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    buckets = max_points // 2
+    if n <= max_points or buckets < 1:
+        return x, y
+    
+    bucket_size = -(-n // buckets)  # Ceiling division
+    rows = -(-n // bucket_size)
+    padded = np.full(rows * bucket_size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, bucket_size)
+    
+    offsets = np.arange(rows) * bucket_size
+    keep = np.concatenate([offsets + np.nanargmin(padded, axis=1),
+                           offsets + np.nanargmax(padded, axis=1)])
+    keep = np.unique(keep)  # Sorted, so points stay in time order
+    return x[keep], y[keep]
+
+DOWNSAMPLERS = {
+    "lttb": downsample_lttb,
+    "minmax": downsample_minmax
+}
+
+@timed_stage("render")
+def create_timeseries_visualisation(weather_data, field="temperature", method="lttb",
+                                    max_points=800, output_type='display'):
+    """
+    Create a line chart of an hourly field over any length of time.
+    Long series are downsampled before plotting so render time stays roughly
+    the same however many readings there are.
+    
+    Args:
+        weather_data (dict, list or tuple): A processed weather report, a list of
+            reports (e.g. stored history) or a (times, values) pair with times in
+            seconds since the epoch
+        field (str): One of the keys in TIMESERIES_FIELDS
+        method (str): 'lttb', 'minmax' or None to plot every point
+        max_points (int): Maximum number of points to draw
+        output_type (str): Either 'display' to show in notebook or 'figure' to return the figure
+        
+    Returns:
+        If output_type is 'figure', returns the matplotlib figure object
+        Otherwise, displays the visualisation in the notebook
+    """
+    if isinstance(weather_data, dict) and "error" in weather_data:
+        print(f"Error: {weather_data['error']}")
+        return None
+    
+    if isinstance(weather_data, tuple):
+        times, values = (np.asarray(a, dtype=float) for a in weather_data)
+        location_name = None
+    else:
+        times, values = extract_hourly_series(weather_data, field)
+        reports = [weather_data] if isinstance(weather_data, dict) else weather_data
+        names = {f"{r['location']['name']}, {r['location']['country']}" for r in reports if "error" not in r}
+        location_name = names.pop() if len(names) == 1 else None
+    
+    if len(times) == 0:
+        print("No data available to plot.")
+        return None
+    
+    total_points = len(times)
+    if method:
+        if method not in DOWNSAMPLERS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        times, values = DOWNSAMPLERS[method](times, values, max_points)
+    
+    # Set up the figure and styling
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    label = TIMESERIES_FIELDS.get(field, (field, None))[0]
+    dates = times.astype('datetime64[s]')
+    ax.plot(dates, values, '-', color='teal', linewidth=1.5, label=label)
+    
+    # Set labels and title
+    title = f'{label} over Time'
+    if location_name:
+        title += f' for {location_name}'
+    ax.set_xlabel('Time', fontsize=12)
+    ax.set_ylabel(label, fontsize=12)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    fig.autofmt_xdate()
+    
+    # Show how much the series was reduced
+    if len(times) < total_points:
+        ax.annotate(f'{len(times)} of {total_points} points ({method})',
+                    xy=(0.02, 0.95), xycoords='axes fraction',
+                    fontsize=10, backgroundcolor='white', alpha=0.8)
+    
+    ax.legend(loc='upper right')
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    
+    plt.tight_layout()
+    
+    if output_type == 'figure':
+        return fig
+    else:
+        plt.show()
+        plt.close()
+
+class WeatherComparison:
+    """
+    Compare many locations at once. Each hourly field is stacked into a
+    locations x time-steps NumPy matrix (NaN where a location has no reading),
+    so ranking, threshold and top-k questions are answered with array operations
+    instead of one generate_weather_response call per location.
+    
+    Usage:
+        comparison = WeatherComparison(reports)
+        start, end = day_bounds(1)                      # Tomorrow
+        comparison.top_k("temperature", 5, start, end)  # Five warmest places
+    """
+
+    def __init__(self, reports, fields=None):
+        """
+        Args:
+            reports (list): Processed weather reports (reports with errors are skipped)
+            fields (list): Keys of TIMESERIES_FIELDS to load (defaults to all of them)
+        """
+        fields = fields or list(TIMESERIES_FIELDS)
+        reports = [report for report in reports if "error" not in report]
+        
+        self.locations = [f"{r['location']['name']}, {r['location']['country']}" for r in reports]
+        
+        # Lazy reports are read from their HourlyBuffer columns without building hourly records
+        series = [hourly_columns(report, fields) for report in reports]
+        
+        all_times = [times for times, _ in series]
+        self.times = np.unique(np.concatenate(all_times)) if all_times else np.array([], dtype=float)
+        
+        self.fields = {field: np.full((len(reports), len(self.times)), np.nan) for field in fields}
+        for row, (times, values) in enumerate(series):
+            columns = np.searchsorted(self.times, times)
+            for field in fields:
+                self.fields[field][row, columns] = values[field]
+
+    def _window(self, field, start=None, end=None):
+        """
+        Return the columns of a field that fall in [start, end).
+        """
+        if field not in self.fields:
+            raise ValueError(f"Field not loaded: {field}")
+        lo = 0 if start is None else np.searchsorted(self.times, start, side="left")
+        hi = len(self.times) if end is None else np.searchsorted(self.times, end, side="left")
+        return self.fields[field][:, lo:hi]
+
+    def aggregate(self, field, start=None, end=None, how="max"):
+        """
+        Reduce each location's readings in a time window to one value.
+        
+        Args:
+            field (str): Field to aggregate
+            start (float): Window start in seconds since the epoch (None for the beginning)
+            end (float): Window end, exclusive (None for the end)
+            how (str): 'max', 'min', 'mean' or 'sum'
+            
+        Returns:
+            np.ndarray: One value per location (NaN if it has no readings in the window)
+        """
+        reducers = {"max": np.nanmax, "min": np.nanmin, "mean": np.nanmean, "sum": np.nansum}
+        if how not in reducers:
+            raise ValueError(f"Unknown aggregation: {how}")
+        window = self._window(field, start, end)
+        values = np.full(len(self.locations), np.nan)
+        has_data = ~np.all(np.isnan(window), axis=1) if window.shape[1] else np.zeros(len(self.locations), bool)
+        if has_data.any():
+            values[has_data] = reducers[how](window[has_data], axis=1)
+        return values
+
+    def rank(self, field, start=None, end=None, how="max", descending=True):
+        """
+        Rank all locations by an aggregated field.
+        
+        Returns:
+            list: (location, value) pairs, best first; locations without data are left out
+        """
+        values = self.aggregate(field, start, end, how)
+        order = np.argsort(-values if descending else values, kind="stable")
+        return [(self.locations[i], float(values[i])) for i in order if not np.isnan(values[i])]
+
+    def top_k(self, field, k, start=None, end=None, how="max", descending=True):
+        """
+        Return the k best locations by an aggregated field without sorting all of them.
+        
+        Returns:
+            list: Up to k (location, value) pairs, best first
+        """
+        values = self.aggregate(field, start, end, how)
+        scores = np.where(np.isnan(values), np.inf, -values if descending else values)
+        k = min(k, int(np.sum(~np.isnan(values))))
+        if k <= 0:
+            return []
+        best = np.argpartition(scores, k - 1)[:k]
+        best = best[np.argsort(scores[best], kind="stable")]
+        return [(self.locations[i], float(values[i])) for i in best]
+
+    def threshold(self, field, op, value, start=None, end=None, how="max"):
+        """
+        Find locations whose aggregated field passes a threshold,
+        e.g. threshold("pop", ">", 70, *day_bounds(1)).
+        
+        Args:
+            op (str): One of '>', '>=', '<', '<=', '=='
+            value (float): Threshold value
+            
+        Returns:
+            list: (location, value) pairs that pass, in input order
+        """
+        operators = {">": np.greater, ">=": np.greater_equal, "<": np.less,
+                     "<=": np.less_equal, "==": np.equal}
+        if op not in operators:
+            raise ValueError(f"Unknown comparison operator: {op}")
+        values = self.aggregate(field, start, end, how)
+        with np.errstate(invalid="ignore"):
+            matches = np.flatnonzero(operators[op](values, value))
+        return [(self.locations[i], float(values[i])) for i in matches]
+
+def day_bounds(day_offset=0, now=None):
+    """
+    Start and end of a local calendar day, for use as a comparison window.
+    
+    Args:
+        day_offset (int): 0 for today, 1 for tomorrow and so on
+        now (float): Time that counts as now, in seconds since the epoch (defaults to the current time)
+        
+    Returns:
+        tuple: (start, end) in seconds since the epoch
+    """
+    today = datetime.now().date() if now is None else datetime.fromtimestamp(now).date()
+    day = datetime.combine(today + timedelta(days=day_offset), datetime.min.time())
+    return day.timestamp(), (day + timedelta(days=1)).timestamp()
+
+@timed_stage("render")
+def create_comparison_visualisation(comparison, field="temperature", locations=None,
+                                    columns=8, output_type='display'):
+    """
+    Create a grid of small line charts, one per location, on a shared scale so
+    the locations can be compared at a glance.
+    
+    All panels are drawn on one set of axes as a single LineCollection (each
+    location's series is scaled into its own grid cell), so hundreds of
+    locations render about as fast as a handful.
+    
+    Args:
+        comparison (WeatherComparison): The stacked location data
+        field (str): Field to plot
+        locations (list): Locations to include (defaults to all of them)
+        columns (int): Number of charts per row
+        output_type (str): Either 'display' to show in notebook or 'figure' to return the figure
+        
+    Returns:
+        If output_type is 'figure', returns the matplotlib figure object
+        Otherwise, displays the visualisation in the notebook
+    """
+    rows_to_plot = [i for i, name in enumerate(comparison.locations)
+                    if locations is None or name in locations]
+    if not rows_to_plot or len(comparison.times) == 0:
+        print("No locations to plot.")
+        return None
+    
+    values = comparison.fields[field][rows_to_plot]
+    label = TIMESERIES_FIELDS.get(field, (field, None))[0]
+    
+    columns = max(1, min(columns, len(rows_to_plot)))
+    rows = -(-len(rows_to_plot) // columns)  # Ceiling division
+    cell = np.arange(len(rows_to_plot))
+    cell_x = (cell % columns)[:, None]
+    cell_y = (rows - 1 - cell // columns)[:, None]
+    
+    # Scale every series into its cell: time across, shared value range up
+    t0, t1 = comparison.times[0], comparison.times[-1]
+    x = (comparison.times - t0) / ((t1 - t0) or 1)
+    low, high = np.nanmin(values), np.nanmax(values)
+    y = (values - low) / ((high - low) or 1)
+    xs = cell_x + 0.05 + 0.9 * x[None, :]
+    ys = cell_y + 0.08 + 0.7 * y
+    
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, ax = plt.subplots(figsize=(2.2 * columns, 1.6 * rows + 1))
+    ax.add_collection(LineCollection(np.stack([xs, ys], axis=-1), colors='teal', linewidths=1))
+    
+    # Cell borders and titles
+    ax.vlines(np.arange(columns + 1), 0, rows, colors='lightgray', linewidth=0.8)
+    ax.hlines(np.arange(rows + 1), 0, columns, colors='lightgray', linewidth=0.8)
+    for i, row in enumerate(rows_to_plot):
+        ax.text(cell_x[i, 0] + 0.05, cell_y[i, 0] + 0.95, comparison.locations[row],
+                fontsize=8, va='top', clip_on=True)
+    
+    ax.set_xlim(0, columns)
+    ax.set_ylim(0, rows)
+    ax.set_axis_off()
+    
+    start = datetime.fromtimestamp(t0).strftime('%a %d %b %H:%M')
+    finish = datetime.fromtimestamp(t1).strftime('%a %d %b %H:%M')
+    ax.set_title(f'{label} by Location\n'
+                 f'Shared scale {low:.1f} to {high:.1f}, {start} to {finish}',
+                 fontsize=12, fontweight='bold')
+    fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=1 - 0.8 / (1.6 * rows + 1))
+    
+    if output_type == 'figure':
+        return fig
+    else:
+        plt.show()
+        plt.close()
+
+def render_current_weather(weather_data):
+    """
+    Build the current weather screen as a list of lines.
     
     Args:
         weather_data (dict): The processed weather data
+        
+    Returns:
+        list: Lines of text to display
     """
     if "error" in weather_data:
-        print(f"Error: {weather_data['error']}")
-        return
+        return [f"Error: {weather_data['error']}"]
     
     location = f"{weather_data['location']['name']}, {weather_data['location']['country']}"
     current = weather_data['current']
     
-    print(f"\n{'='*50}")
-    print(f"  CURRENT WEATHER FOR {location.upper()}")
-    print(f"  {datetime.now().strftime('%A, %B %d, %Y at %H:%M')}")
-    print(f"{'='*50}")
-    print(f"Temperature: {current['temperature']:.1f}°C (Feels like: {current['feels_like']:.1f}°C)")
-    print(f"Conditions: {current['description'].capitalize()}")
-    print(f"Humidity: {current['humidity']}%")
-    print(f"Pressure: {current['pressure']} hPa")
-    print(f"Wind: {current['wind']['speed']} m/s")
-    print(f"Visibility: {current['visibility']} km")
-    print(f"Cloud Cover: {current['clouds']}%")
+    lines = [
+        "",
+        f"{'='*50}",
+        f"  CURRENT WEATHER FOR {location.upper()}",
+        f"  {datetime.now().strftime('%A, %B %d, %Y at %H:%M')}",
+        f"{'='*50}",
+        f"Temperature: {current['temperature']:.1f}°C (Feels like: {current['feels_like']:.1f}°C)",
+        f"Conditions: {current['description'].capitalize()}",
+        f"Humidity: {current['humidity']}%",
+        f"Pressure: {current['pressure']} hPa",
+        f"Wind: {current['wind']['speed']} m/s",
+        f"Visibility: {current['visibility']} km",
+        f"Cloud Cover: {current['clouds']}%"
+    ]
     
     # Add rain information if available
     if current.get('rain', 0) > 0:
-        print(f"Rain in Last Hour: {current['rain']} mm")
+        lines.append(f"Rain in Last Hour: {current['rain']} mm")
     
-    print(f"{'='*50}")
+    lines.append(f"{'='*50}")
+    return lines
 
-def display_forecast(weather_data):
+def display_current_weather(weather_data):
     """
-    Display weather forecast information in a formatted text output.
+    Display current weather information in a formatted text output.
+    
+    Args:
+        weather_data (dict): The processed weather data
+    """
+    print("\n".join(render_current_weather(weather_data)))
+
+def render_forecast(weather_data):
+    """
+    Build the forecast screen as a list of lines.
     
     Args:
         weather_data (dict): The processed weather data
+        
+    Returns:
+        list: Lines of text to display
     """
     if "error" in weather_data:
-        print(f"Error: {weather_data['error']}")
-        return
+        return [f"Error: {weather_data['error']}"]
     
     if not weather_data.get('forecast'):
-        print("No forecast data available.")
-        return
+        return ["No forecast data available."]
     
     location = f"{weather_data['location']['name']}, {weather_data['location']['country']}"
     
-    print(f"\n{'='*60}")
-    print(f"  WEATHER FORECAST FOR {location.upper()}")
-    print(f"{'='*60}")
+    lines = [
+        "",
+        f"{'='*60}",
+        f"  WEATHER FORECAST FOR {location.upper()}",
+        f"{'='*60}"
+    ]
     
     for day in weather_data['forecast']:
-        print(f"\n{day['day_name']} ({day['date']}):")
-        print(f"  Temperature: {day['temperature']['min']:.1f}°C to {day['temperature']['max']:.1f}°C")
-        print(f"  Humidity: {day['humidity']['avg']:.0f}% (Range: {day['humidity']['min']}% - {day['humidity']['max']}%)")
-        print(f"  Cloud Cover: {day['clouds']['avg']:.0f}%")
-        print(f"  Precipitation Chance: {day['precipitation_chance']:.0f}%")
+        lines.append("")
+        lines.append(f"{day['day_name']} ({day['date']}):")
+        lines.append(f"  Temperature: {day['temperature']['min']:.1f}°C to {day['temperature']['max']:.1f}°C")
+        lines.append(f"  Humidity: {day['humidity']['avg']:.0f}% (Range: {day['humidity']['min']}% - {day['humidity']['max']}%)")
+        lines.append(f"  Cloud Cover: {day['clouds']['avg']:.0f}%")
+        lines.append(f"  Precipitation Chance: {day['precipitation_chance']:.0f}%")
         
         if 'rain' in day and day['rain']['total'] > 0:
-            print(f"  Expected Rainfall: {day['rain']['total']:.1f} mm")
+            lines.append(f"  Expected Rainfall: {day['rain']['total']:.1f} mm")
             
         # Display some hourly details
-        print("\n  Hourly forecast highlights:")
+        lines.append("")
+        lines.append("  Hourly forecast highlights:")
         morning = None
         noon = None
         evening = None
@@ -815,89 +2120,249 @@ def display_forecast(weather_data):
         
         for time_name, data in time_slots:
             hour = datetime.strptime(data['timestamp'], '%Y-%m-%d %H:%M:%S').hour
-            print(f"    {time_name} ({hour}:00): {data['temperature']:.1f}°C, {data['description'].capitalize()}, "
-                  f"Wind: {data['wind']['speed']} m/s, Precip: {data['pop']:.0f}%")
+            lines.append(f"    {time_name} ({hour}:00): {data['temperature']:.1f}°C, {data['description'].capitalize()}, "
+                         f"Wind: {data['wind']['speed']} m/s, Precip: {data['pop']:.0f}%")
     
-    print(f"\n{'='*60}")
+    lines.append("")
+    lines.append(f"{'='*60}")
+    return lines
 
+def display_forecast(weather_data):
+    """
+    Display weather forecast information in a formatted text output.
+    
+    Args:
+        weather_data (dict): The processed weather data
+    """
+    print("\n".join(render_forecast(weather_data)))
 
-def clear_console():
+
+class TerminalScreen:
     """
-    Clear the console screen using os module.
-    Works on Windows, macOS, and Linux.
+    Compose each screen in a buffer and write it to the terminal in one go.
+    Only the lines that changed since the last frame are redrawn, using ANSI
+    escape codes instead of spawning a shell to clear the console.
     """
-    import os
-    # For Windows
-    if os.name == 'nt':
-        os.system('cls')
-    # For macOS and Linux
-    else:
-        os.system('clear')
+
+    CLEAR = "\x1b[H\x1b[2J"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.previous = None  # Lines of the last frame; None forces a full redraw
+        self.ansi = hasattr(self.stream, "isatty") and self.stream.isatty()
+        if self.ansi and os.name == 'nt':
+            _enable_windows_ansi()
+
+    def invalidate(self):
+        """
+        Force the next frame to be drawn in full (e.g. after other output scrolled the terminal).
+        """
+        self.previous = None
+
+    def draw(self, lines):
+        """
+        Draw a frame. The cursor is left on the line below it, ready for input().
+        
+        Args:
+            lines (list): Lines of text making up the screen
+        """
+        lines = "\n".join(lines).split("\n")
+        
+        if not self.ansi:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            return
+        
+        # Leave room for prompts below the frame; if the terminal could have scrolled,
+        # row positions are no longer reliable so redraw everything
+        rows = shutil.get_terminal_size().lines
+        too_tall = len(lines) >= rows - 4 or (self.previous is not None and len(self.previous) >= rows - 4)
+        
+        if self.previous is None or too_tall:
+            frame = self.CLEAR + "\n".join(lines) + "\n"
+        else:
+            parts = []
+            for row, line in enumerate(lines, 1):
+                if row > len(self.previous) or self.previous[row - 1] != line:
+                    parts.append(f"\x1b[{row};1H{line}\x1b[K")
+            # Clear what's left of the previous frame and anything typed below it
+            parts.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+            frame = "".join(parts)
+        
+        self.previous = None if too_tall else lines
+        self.stream.write(frame)
+        self.stream.flush()
+
+
+def _enable_windows_ansi():
+    """
+    Turn on ANSI escape code handling in the Windows console.
+    """
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        pass
+
 
 def clear_console():
     """
-    Clear the console screen using os module.
-    Works on Windows, macOS, and Linux.
+    Clear the console screen with ANSI escape codes.
+    Works on Windows, macOS, and Linux without starting a shell.
     """
-    import os
-    # For Windows
     if os.name == 'nt':
-        os.system('cls')
-    # For macOS and Linux
-    else:
-        os.system('clear')
+        _enable_windows_ansi()
+    sys.stdout.write(TerminalScreen.CLEAR)
+    sys.stdout.flush()
+
+# Profiling configuration (enabled with the --profile command line option)
+PROFILE_CONFIG = {
+    "enabled": False,
+    "output_dir": "profiles",
+    "top": 25         # Number of functions / lines to list in each report
+}
 
-def run_weather_advisor():
+_profile_counter = [0]
+
+
+@contextlib.contextmanager
+def profile_action(name):
     """
-    Main function to run the Weather Advisor application using standard input instead of PyInputPlus.
+    Profile a menu action or batch job with cProfile and tracemalloc and write a
+    report with the slowest functions, peak memory and allocations by line.
+
+    Usage:
+        with profile_action("View Forecast"):
+            display_forecast(weather_data)
+
+    Args:
+        name (str): Name of the action, used in the report file name
     """
-    clear_console()
+    if not PROFILE_CONFIG["enabled"]:
+        yield
+        return
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        _profile_counter[0] += 1
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+        filename = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{_profile_counter[0]:04d}_{slug}.txt"
+        os.makedirs(PROFILE_CONFIG["output_dir"], exist_ok=True)
+        path = os.path.join(PROFILE_CONFIG["output_dir"], filename)
+
+        stats_output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stats_output)
+        stats.sort_stats("cumulative").print_stats(PROFILE_CONFIG["top"])
+
+        # Ignore the profiler's own allocations when comparing snapshots
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, cProfile.__file__),
+                   tracemalloc.Filter(False, pstats.__file__)]
+        allocations = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Profile for: {name}\n")
+            f.write(f"Wall time: {elapsed:.3f} s\n")
+            f.write(f"Peak traced memory: {peak_memory / 1024:.1f} KiB\n")
+            f.write(f"Traced memory after action: {current_memory / 1024:.1f} KiB\n")
+            f.write(f"\n{'='*60}\nTop functions by cumulative time\n{'='*60}\n")
+            f.write(stats_output.getvalue())
+            f.write(f"\n{'='*60}\nAllocations by line (change during action)\n{'='*60}\n")
+            for stat in allocations[:PROFILE_CONFIG["top"]]:
+                f.write(f"{stat}\n")
+
+        # stderr, so batch answers written to stdout stay valid JSONL
+        print(f"\n[profile] {name}: {elapsed:.3f} s, peak {peak_memory / 1024:.1f} KiB -> {path}", file=sys.stderr)
+
+def run_weather_advisor(fetch=None):
+    """
+    Main function to run the Weather Advisor application using standard input instead of PyInputPlus.
+    Each screen is composed in a buffer and drawn with TerminalScreen.
     
-    print("\n" + "="*60)
-    print("       WELCOME TO THE WEATHER ADVISOR APPLICATION")
-    print("="*60)
-    print("\nThis application allows you to:")
-    print("  1. Check current weather for any location")
-    print("  2. View weather forecasts for up to 5 days")
-    print("  3. Ask natural language questions about the weather")
-    print("  4. View weather data visualizations")
-    print("\nAll data is provided in metric units (°C, m/s, mm, etc.)")
-    print("\nLet's get started!")
+    Args:
+        fetch (callable): Function used to fetch weather data (defaults to get_weather_data,
+            e.g. SharedReportCache(path).get_weather_data to share fetches between processes)
+    """
+    fetch = fetch or get_weather_data
+    screen = TerminalScreen()
+    
+    screen.draw([
+        "",
+        "="*60,
+        "       WELCOME TO THE WEATHER ADVISOR APPLICATION",
+        "="*60,
+        "",
+        "This application allows you to:",
+        "  1. Check current weather for any location",
+        "  2. View weather forecasts for up to 5 days",
+        "  3. Ask natural language questions about the weather",
+        "  4. View weather data visualizations",
+        "",
+        "All data is provided in metric units (°C, m/s, mm, etc.)",
+        "",
+        "Let's get started!"
+    ])
     
     # Initialize with a default location
     location = input("\nEnter a location (city name): ")
-    weather_data = get_weather_data(location)
+    weather_data = fetch(location)
     
     if "error" in weather_data:
-        print(f"\nError retrieving weather data: {weather_data['error']}")
+        screen.draw(["", f"Error retrieving weather data: {weather_data['error']}"])
         location = input("\nPlease try a different location: ")
-        weather_data = get_weather_data(location)
+        weather_data = fetch(location)
         if "error" in weather_data:
-            print(f"\nError retrieving weather data: {weather_data['error']}")
-            print("\nExiting application. Please try again later.")
+            screen.draw([
+                "",
+                f"Error retrieving weather data: {weather_data['error']}",
+                "",
+                "Exiting application. Please try again later."
+            ])
             return
     
+    menu_options = [
+        'View Current Weather',
+        'View Forecast',
+        'Ask a Weather Question',
+        'View Temperature Visualization',
+        'View Precipitation Visualization',
+        'View Wind Visualization',
+        'Change Location',
+        'Exit'
+    ]
+    
     while True:
-        clear_console()
-        
-        print("\n" + "="*60)
-        print(f"       WEATHER ADVISOR: {weather_data['location']['name'].upper()}, {weather_data['location']['country']}")
-        print("="*60)
-        
-        menu_options = [
-            'View Current Weather',
-            'View Forecast',
-            'Ask a Weather Question',
-            'View Temperature Visualization',
-            'View Precipitation Visualization',
-            'View Wind Visualization',
-            'Change Location',
-            'Exit'
+        menu_lines = [
+            "",
+            "="*60,
+            f"       WEATHER ADVISOR: {weather_data['location']['name'].upper()}, {weather_data['location']['country']}",
+            "="*60,
+            "",
+            "What would you like to do?"
         ]
-        
-        print("\nWhat would you like to do?")
         for i, option in enumerate(menu_options, 1):
-            print(f"{i}. {option}")
+            menu_lines.append(f"{i}. {option}")
+        screen.draw(menu_lines)
         
         # Input validation for menu choice
         while True:
@@ -910,84 +2375,1309 @@ def run_weather_advisor():
             except ValueError:
                 print("Please enter a valid number.")
         
-        if choice == 1:  # View Current Weather
-            clear_console()
-            display_current_weather(weather_data)
-            input("Press Enter to continue...")
+        if choice == 8:  # Exit
+            screen.draw(["", "Thank you for using the Weather Advisor Application. Goodbye!"])
+            break
+        
+        # Prompt for any input first so the profile only covers the action itself
+        if choice == 3:  # Ask a Weather Question
+            question_lines = [
+                "",
+                "="*60,
+                "              ASK A WEATHER QUESTION",
+                "="*60,
+                "",
+                "Examples:",
+                "- Will it rain tomorrow in this city?",
+                "- What's the temperature going to be like this weekend?",
+                "- How windy is it right now?",
+                "- What's the forecast for next Tuesday?"
+            ]
+            screen.draw(question_lines)
+            question = input("\nYour weather question: ")
+            question_lines += ["", f"Your weather question: {question}"]
+        
+        elif choice == 7:  # Change Location
+            location_lines = [
+                "",
+                "="*60,
+                "                  CHANGE LOCATION",
+                "="*60
+            ]
+            screen.draw(location_lines)
+            new_location = input("\nEnter a new location (city name): ")
+            location_lines += ["", f"Enter a new location (city name): {new_location}"]
+        
+        figure = None
+        with profile_action(menu_options[choice - 1]):
+            if choice == 1:  # View Current Weather
+                screen.draw(render_current_weather(weather_data))
             
-        elif choice == 2:  # View Forecast
-            clear_console()
-            display_forecast(weather_data)
-            input("Press Enter to continue...")
-            
-        elif choice == 3:  # Ask a Weather Question
-            clear_console()
-            print("\n" + "="*60)
-            print("              ASK A WEATHER QUESTION")
-            print("="*60)
-            print("\nExamples:")
-            print("- Will it rain tomorrow in this city?")
-            print("- What's the temperature going to be like this weekend?")
-            print("- How windy is it right now?")
-            print("- What's the forecast for next Tuesday?")
+            elif choice == 2:  # View Forecast
+                screen.draw(render_forecast(weather_data))
             
-            question = input("\nYour weather question: ")
-            parsed_question = parse_weather_question(question)
-            
-            # If no location was found in the question, use the current one
-            if not parsed_question["location"]:
-                parsed_question["location"] = weather_data["location"]["name"]
-            
-            # If the location in the question is different from the current one, fetch new data
-            if (parsed_question["location"].lower() != weather_data["location"]["name"].lower() and
-                parsed_question["location"].lower() != f"{weather_data['location']['name']}, {weather_data['location']['country']}".lower()):
-                print(f"\nFetching weather data for {parsed_question['location']}...")
-                new_weather_data = get_weather_data(parsed_question["location"])
-                if "error" not in new_weather_data:
-                    weather_data = new_weather_data
-                else:
-                    print(f"\nCouldn't find weather data for {parsed_question['location']}. Using current location instead.")
+            elif choice == 3:  # Ask a Weather Question
+                parsed_question = parse_weather_question(question)
             
-            response = generate_weather_response(parsed_question, weather_data)
-            print(f"\nResponse: {response}")
+                # If no location was found in the question, use the current one
+                if not parsed_question["location"]:
+                    parsed_question["location"] = weather_data["location"]["name"]
             
-            input("\nPress Enter to continue...")
+                # If the location in the question is different from the current one, fetch new data
+                if (parsed_question["location"].lower() != weather_data["location"]["name"].lower() and
+                    parsed_question["location"].lower() != f"{weather_data['location']['name']}, {weather_data['location']['country']}".lower()):
+                    question_lines += ["", f"Fetching weather data for {parsed_question['location']}..."]
+                    screen.draw(question_lines)
+                    new_weather_data = fetch(parsed_question["location"])
+                    if "error" not in new_weather_data:
+                        weather_data = new_weather_data
+                    else:
+                        question_lines += ["", f"Couldn't find weather data for {parsed_question['location']}. Using current location instead."]
             
-        elif choice == 4:  # View Temperature Visualization
-            clear_console()
-            print("\nGenerating temperature visualization...")
-            create_temperature_visualisation(weather_data)
-            input("\nPress Enter to continue...")
+                response = generate_weather_response(parsed_question, weather_data)
+                screen.draw(question_lines + ["", f"Response: {response}"])
             
-        elif choice == 5:  # View Precipitation Visualization
-            clear_console()
-            print("\nGenerating precipitation visualization...")
-            create_precipitation_visualisation(weather_data)
-            input("\nPress Enter to continue...")
+            elif choice in (4, 5, 6):  # View Visualizations
+                chart_name, create_chart = {
+                    4: ("temperature", create_temperature_visualisation),
+                    5: ("precipitation", create_precipitation_visualisation),
+                    6: ("wind", create_wind_visualisation)
+                }[choice]
+                screen.draw(["", f"Generating {chart_name} visualization..."])
+                figure = create_chart(weather_data, output_type='figure')
             
-        elif choice == 6:  # View Wind Visualization
-            clear_console()
-            print("\nGenerating wind visualization...")
-            create_wind_visualisation(weather_data)
-            input("\nPress Enter to continue...")
+            elif choice == 7:  # Change Location
+                location_lines += ["", f"Fetching weather data for {new_location}..."]
+                screen.draw(location_lines)
+                new_weather_data = fetch(new_location)
             
-        elif choice == 7:  # Change Location
-            new_location = input("\nEnter a new location (city name): ")
-            print(f"\nFetching weather data for {new_location}...")
-            new_weather_data = get_weather_data(new_location)
+                if "error" in new_weather_data:
+                    location_lines += ["", f"Error: {new_weather_data['error']}"]
+                else:
+                    weather_data = new_weather_data
+                    location_lines += ["", f"Location changed to {weather_data['location']['name']}, {weather_data['location']['country']}"]
+                screen.draw(location_lines)
+        
+        # Showing the chart blocks until its window is closed, so keep it out of the profile too
+        if figure is not None:
+            plt.show()
+            plt.close(figure)
+        
+        input("\nPress Enter to continue...")
+
+def read_questions(stream):
+    """
+    Read weather questions one at a time from a stream.
+    Each line is either a JSON object with a "question" field (and optional "id"
+    and "location" fields) or plain question text.
+    
+    Args:
+        stream: File object to read from (e.g. sys.stdin)
+        
+    Yields:
+        dict: Question record with id, question and location (None if not given)
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        
+        record = None
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+        
+        if isinstance(record, dict):
+            yield {
+                "id": record.get("id", line_number),
+                "question": str(record.get("question", "")),
+                "location": record.get("location")
+            }
+        else:
+            yield {"id": line_number, "question": line, "location": None}
+
+# Answering a question takes well under a millisecond, so below this many questions
+# per worker it's quicker to answer in this process than to ship reports to the pool
+BATCH_MIN_QUESTIONS_PER_WORKER = 1000
+
+def _answer_group(task):
+    """
+    Answer parsed questions using the reports they need.
+    Runs inside a worker process.
+    
+    Args:
+        task (tuple): (dict of location key -> weather_data,
+            list of (location key, position, parsed_question))
+        
+    Returns:
+        list: (position, answer) pairs
+    """
+    reports, items = task
+    return [(position, generate_weather_response(parsed_question, reports[location_key]))
+            for location_key, position, parsed_question in items]
+
+def _fetch_locations(locations, weather_cache, fetch, forecast_days, fetch_workers, max_cached):
+    """
+    Fetch weather data for every location not already in the cache.
+    """
+    missing = [location for location in locations if location not in weather_cache]
+    count_metric("cache_hits", len(locations) - len(missing), cache="batch")
+    count_metric("cache_misses", len(missing), cache="batch")
+    
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(fetch_workers, len(missing)))) as executor:
+            results = executor.map(lambda location: fetch(location, forecast_days), missing)
+            for location, weather_data in zip(missing, results):
+                weather_cache[location] = weather_data
+    
+    for location in locations:
+        weather_cache.move_to_end(location)
+    while len(weather_cache) > max(max_cached, len(locations)):
+        weather_cache.popitem(last=False)
+
+def _answer_chunk(records, executor, weather_cache, options):
+    """
+    Answer one chunk of question records, fetching each location once.
+    
+    Returns:
+        list: Output records in the same order as the input records
+    """
+    default_location = options["default_location"]
+    parsed_questions = []
+    groups = OrderedDict()
+    
+    for position, record in enumerate(records):
+        parsed_question = parse_weather_question(record["question"])
+        if record["location"]:
+            parsed_question["location"] = record["location"]
+        if not parsed_question["location"]:
+            parsed_question["location"] = default_location
+        parsed_questions.append(parsed_question)
+        
+        location_key = (parsed_question["location"] or "").strip().lower()
+        groups.setdefault(location_key, []).append((position, parsed_question))
+    
+    locations = [location for location in groups if location]
+    if default_location:
+        locations.append(default_location.strip().lower())
+    _fetch_locations(list(dict.fromkeys(locations)), weather_cache, options["fetch"], options["forecast_days"],
+                     options["fetch_workers"], options["max_cached_locations"])
+    
+    resolved = {}
+    locations = [None] * len(records)
+    for location_key, items in groups.items():
+        weather_data = weather_cache.get(location_key, {"error": "No location given in the question."})
+        
+        # Like the interactive advisor, fall back to the default location if the
+        # location in the question couldn't be found
+        if "error" in weather_data and default_location:
+            weather_data = weather_cache[default_location.strip().lower()]
+        resolved[location_key] = weather_data
+        
+        if "error" not in weather_data:
+            location = f"{weather_data['location']['name']}, {weather_data['location']['country']}"
+            for position, _ in items:
+                locations[position] = location
+    
+    workers = options["workers"] if executor is not None else 1
+    if len(records) < workers * BATCH_MIN_QUESTIONS_PER_WORKER:
+        workers = 1
+    
+    # One task per worker, so each report is pickled once per task that needs it.
+    # Groups bigger than a worker's share are split so one popular city doesn't
+    # keep a single worker busy; pieces go to the least loaded task, biggest first.
+    share = -(-len(records) // workers)
+    pieces = [(location_key, items[start:start + share])
+              for location_key, items in groups.items() for start in range(0, len(items), share)]
+    tasks = [(0, {}, []) for _ in range(workers)]
+    for location_key, items in sorted(pieces, key=lambda piece: -len(piece[1])):
+        index = min(range(workers), key=lambda i: tasks[i][0])
+        load, reports, task_items = tasks[index]
+        reports[location_key] = resolved[location_key]
+        task_items.extend((location_key, position, parsed_question) for position, parsed_question in items)
+        tasks[index] = (load + len(items), reports, task_items)
+    tasks = [(reports, task_items) for _, reports, task_items in tasks if task_items]
+    
+    if workers == 1:
+        results = map(_answer_group, tasks)
+    else:
+        results = executor.map(_answer_group, tasks)
+    
+    output = [None] * len(records)
+    for task_answers in results:
+        for position, answer in task_answers:
+            record = records[position]
+            output[position] = {
+                "id": record["id"],
+                "question": record["question"],
+                "location": locations[position],
+                "answer": answer
+            }
+    
+    return output
+
+def run_batch(input_stream, output_stream, workers=None, chunk_size=5000, default_location=None,
+              forecast_days=5, fetch_workers=8, max_cached_locations=1024, fetch=None):
+    """
+    Answer a stream of weather questions without user interaction.
+    Questions are read in chunks so memory use stays bounded, grouped by location so
+    each city is fetched once, answered across a process pool (or in this process
+    for chunks too small to be worth it) and written out as JSON lines in the same
+    order they were read.
+    
+    Args:
+        input_stream: File object with one question per line (JSONL or plain text)
+        output_stream: File object the JSONL answers are written to
+        workers (int): Number of worker processes (None uses the CPU count, 1 answers in this process)
+        chunk_size (int): Number of questions held in memory at a time
+        default_location (str): Location used when a question doesn't name one
+        forecast_days (int): Number of days to forecast (1-5)
+        fetch_workers (int): Number of locations fetched at the same time
+        max_cached_locations (int): Number of locations kept between chunks
+        fetch (callable): Function used to fetch a location (defaults to get_weather_data,
+            e.g. TileCache().get_weather_data to share fetches between nearby places)
+        
+    Returns:
+        dict: Number of questions answered, chunks processed and locations fetched
+    """
+    workers = workers or os.cpu_count() or 1
+    options = {
+        "workers": workers,
+        "default_location": default_location,
+        "forecast_days": forecast_days,
+        "fetch_workers": fetch_workers,
+        "max_cached_locations": max_cached_locations,
+        "fetch": fetch or get_weather_data
+    }
+    weather_cache = OrderedDict()
+    summary = {"questions": 0, "chunks": 0}
+    
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        chunk = []
+        questions = read_questions(input_stream)
+        while True:
+            record = next(questions, None)
+            if record is not None:
+                chunk.append(record)
+                if len(chunk) < chunk_size:
+                    continue
+            if not chunk:
+                break
+            
+            summary["chunks"] += 1
+            with profile_action(f"Batch Chunk {summary['chunks']}"):
+                for answer in _answer_chunk(chunk, executor, weather_cache, options):
+                    output_stream.write(json.dumps(answer, ensure_ascii=False) + "\n")
+                output_stream.flush()
+            summary["questions"] += len(chunk)
+            chunk = []
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    return summary
+
+# Tile sharing configuration
+# Locations are snapped to a grid of tile_size x tile_size degree tiles (0.1° is
+# about 11 km); one fetch serves every location in the same tile for ttl seconds
+TILE_CONFIG = {
+    "tile_size": 0.1,
+    "ttl": 1800
+}
+
+def snap_to_tile(lat, lon, tile_size=None):
+    """
+    Return the key of the grid tile containing a coordinate.
+    
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        tile_size (float): Tile size in degrees (defaults to TILE_CONFIG["tile_size"])
+        
+    Returns:
+        tuple: (row, column) of the tile
+    """
+    tile_size = tile_size or TILE_CONFIG["tile_size"]
+    return (math.floor(lat / tile_size), math.floor(lon / tile_size))
+
+
+class TileCache:
+    """
+    Share weather data between nearby locations.
+    
+    Fetched reports are stored in a grid hash keyed by tile. The coordinates of
+    every location name seen are remembered, so once a suburb has been fetched
+    once, later requests for it (or for any coordinate) are served from a fresh
+    tile that a neighbouring location already paid for.
+    
+    The get_weather_data method has the same signature as the module function,
+    so a TileCache can be passed as the fetch function of RefreshScheduler or run_batch.
+    """
+
+    def __init__(self, fetch=None, clock=time.time, **config):
+        for key in config:
+            if key not in TILE_CONFIG:
+                raise ValueError(f"Unknown tile option: {key}")
+        self.config = dict(TILE_CONFIG, **config)
+        self.fetch = fetch or get_weather_data
+        self.clock = clock
+        self.tiles = {}      # tile key -> (weather_data, fetched_at)
+        self.places = {}     # location name (lower case) -> location dict from the API
+        self._lock = threading.Lock()
+
+    def _fresh_tile(self, lat, lon):
+        entry = self.tiles.get(snap_to_tile(lat, lon, self.config["tile_size"]))
+        if entry and self.clock() - entry[1] < self.config["ttl"]:
+            return entry[0]
+        return None
+
+    def _store(self, weather_data):
+        coordinates = weather_data["location"]["coordinates"]
+        key = snap_to_tile(coordinates["lat"], coordinates["lon"], self.config["tile_size"])
+        self.purge_expired()
+        with self._lock:
+            self.tiles[key] = (weather_data, self.clock())
+
+    def purge_expired(self):
+        """
+        Drop expired tiles. Called on every store, so long-running processes
+        only keep tiles that could still be served.
+        
+        Returns:
+            int: Number of tiles dropped
+        """
+        cutoff = self.clock() - self.config["ttl"]
+        with self._lock:
+            expired = [key for key, (_, fetched_at) in self.tiles.items() if fetched_at <= cutoff]
+            for key in expired:
+                del self.tiles[key]
+        return len(expired)
+
+    def add_place(self, name, lat, lon, country=None):
+        """
+        Register the coordinates of a location name so it can be served from tiles
+        without ever being fetched by name. Without a country, the country of the
+        tile's report is used.
+        """
+        self.places[name.strip().lower()] = {
+            "name": name, "country": country, "coordinates": {"lat": lat, "lon": lon}
+        }
+
+    def get_weather_data(self, location=None, forecast_days=5, coordinates=None):
+        """
+        Retrieve weather data, reusing a fresh tile when the location falls inside one.
+        
+        Args:
+            location (str): City or location name
+            forecast_days (int): Number of days to forecast (1-5)
+            coordinates (tuple): Optional (lat, lon) to look up instead of the location name
             
-            if "error" in new_weather_data:
-                print(f"\nError: {new_weather_data['error']}")
-                input("Press Enter to continue...")
+        Returns:
+            dict: Weather data; when served from a tile, "location" describes the
+                requested place and "tile_source" names the location that was fetched
+        """
+        place = self.places.get(location.strip().lower()) if location else None
+        point = coordinates
+        if point is None and place is not None:
+            point = (place["coordinates"]["lat"], place["coordinates"]["lon"])
+        
+        if point is not None:
+            shared = self._fresh_tile(*point)
+            if shared is not None and len(shared["forecast"]) >= min(forecast_days, 5):
+                count_metric("cache_hits", cache="tile")
+                if place is None:
+                    place = {"name": location or shared["location"]["name"],
+                             "country": None,
+                             "coordinates": {"lat": point[0], "lon": point[1]}}
+                place = dict(place, country=place["country"] or shared["location"]["country"])
+                return dict(shared, location=place,
+                            tile_source=f"{shared['location']['name']}, {shared['location']['country']}")
+        
+        count_metric("cache_misses", cache="tile")
+        weather_data = self.fetch(location, forecast_days, coordinates=coordinates)
+        if "error" not in weather_data:
+            self._store(weather_data)
+            if location:
+                self.places[location.strip().lower()] = weather_data["location"]
+        return weather_data
+
+# Shared cache configuration
+# Reports are stored in an SQLite database in WAL mode so every advisor and batch
+# process on the machine can read what any one of them fetched
+SHARED_CACHE_CONFIG = {
+    "path": "weather_cache.sqlite3",
+    "ttl": 1800,           # Seconds a report stays fresh (same meaning as TileCache ttl)
+    "busy_timeout": 5000   # Milliseconds to wait for another process's write lock
+}
+
+def plain_report(weather_data):
+    """
+    Return a copy of a report made only of plain dicts and lists, with any lazy
+    hourly lists built, ready for serialisation. Use this rather than passing a
+    report processed with lazy_hourly straight to json.dumps or copy.deepcopy,
+    which would leave out the hourly lists that haven't been read yet.
+    
+    Args:
+        weather_data (dict): The processed weather data
+        
+    Returns:
+        dict: The report as plain Python objects
+    """
+    if "forecast" not in weather_data:
+        return dict(weather_data)
+    return dict(weather_data, forecast=[dict(day, hourly=day["hourly"]) for day in weather_data["forecast"]])
+
+def json_dumps(obj):
+    """
+    Encode an object as compact UTF-8 JSON with the fastest codec available.
+    """
+    if JSON_CODEC == "orjson":
+        return orjson.dumps(obj)
+    if JSON_CODEC == "ujson":
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def json_loads(data):
+    """
+    Decode UTF-8 JSON with the fastest codec available.
+    """
+    if JSON_CODEC == "orjson":
+        return orjson.loads(data)
+    if JSON_CODEC == "ujson":
+        return ujson.loads(data)
+    return json.loads(data)
+
+# Binary report format:
+#   magic, then a JSON block with everything except the hourly readings, then the
+#   readings of all days as the columns of an HourlyBuffer (one 8-byte number per
+#   reading per column) with the weather descriptions stored once in a string table.
+#   Decoding wraps those columns without copying, so no hourly records are built
+#   until they are read. A CRC32 of everything before it ends the report.
+REPORT_MAGIC = b"WWR\x03"
+
+# Numeric HourlyBuffer columns in the order they are written (after "dt")
+REPORT_COLUMNS = ("temperature", "feels_like", "humidity", "pressure", "clouds",
+                  "wind_speed", "wind_direction", "pop", "rain", "snow")
+
+def _report_buffer(weather_data):
+    """
+    Return the HourlyBuffer behind a lazily processed report, if its days cover
+    the whole buffer in order; otherwise None.
+    """
+    forecast = weather_data.get("forecast", [])
+    if not forecast or not all(isinstance(day, DailySummary) for day in forecast):
+        return None
+    buffer = forecast[0]._buffer
+    position = 0
+    for day in forecast:
+        if day._buffer is not buffer or day._start != position:
+            return None
+        position = day._stop
+    return buffer if position == len(buffer.weather_codes) else None
+
+def _record_columns(hours):
+    """
+    Build HourlyBuffer-style columns from hourly records.
+    """
+    weather_index = {}
+    codes = [weather_index.setdefault((h["description"], h["main"], h["icon"]), len(weather_index))
+             for h in hours]
+    dt = [int(datetime.fromisoformat(h["timestamp"]).timestamp()) for h in hours]
+    
+    rows = [(h["temperature"], h["feels_like"], h["humidity"], h["pressure"], h["clouds"],
+             h["wind"]["speed"], h["wind"]["direction"], h["pop"], h["rain"], h["snow"])
+            for h in hours]
+    columns = {"dt": np.array(dt, dtype=np.int64)}
+    int_rows = {}
+    for name, values in zip(REPORT_COLUMNS, zip(*rows) if rows else [()] * len(REPORT_COLUMNS)):
+        is_int = [type(v) is int for v in values]
+        if all(is_int):
+            columns[name] = np.array(values, dtype=np.int64)
+        else:
+            columns[name] = np.array(values, dtype=np.float64)
+            if any(is_int):
+                int_rows[name] = np.array(is_int, dtype=bool)
+    return columns, int_rows, np.array(codes, dtype=np.int16), list(weather_index)
+
+def encode_report(weather_data):
+    """
+    Encode a processed report in the compact binary format.
+    
+    Reports processed with lazy_hourly are encoded straight from their
+    HourlyBuffer; others are packed into columns from their hourly records.
+    
+    Args:
+        weather_data (dict): The processed weather data
+        
+    Returns:
+        bytes: The encoded report
+    """
+    forecast = weather_data.get("forecast", [])
+    meta = dict(weather_data)
+    if "forecast" in meta:
+        meta["forecast"] = [{k: v for k, v in day.items() if k != "hourly"} for day in forecast]
+    
+    buffer = _report_buffer(weather_data)
+    if buffer is not None:
+        day_lengths = [day._stop - day._start for day in forecast]
+        columns, int_rows = buffer.columns, buffer.int_rows
+        codes, weather_table = buffer.weather_codes, buffer.weather_table
+    else:
+        days = [day["hourly"] for day in forecast]
+        day_lengths = [len(hourly) for hourly in days]
+        columns, int_rows, codes, weather_table = _record_columns(
+            [hour_data for hourly in days for hour_data in hourly])
+    count = sum(day_lengths)
+    
+    meta_bytes = json_dumps(meta)
+    table_bytes = json_dumps(weather_table)
+    parts = [
+        REPORT_MAGIC,
+        struct.pack("<I", len(meta_bytes)), meta_bytes,
+        struct.pack("<IH", count, len(day_lengths)),
+        np.array(day_lengths, dtype="<u2").tobytes(),
+        struct.pack("<I", len(table_bytes)), table_bytes,
+        codes.astype("<u2").tobytes(),
+        columns["dt"].astype("<i8").tobytes()
+    ]
+    
+    # Each column is tagged i (int64), f (float64) or m (float64 followed by a
+    # byte per reading marking the ones that were ints)
+    for name in REPORT_COLUMNS:
+        column = columns[name]
+        if column.dtype.kind == "i":
+            parts += [b"i", column.astype("<i8").tobytes()]
+        elif name in int_rows:
+            parts += [b"m", column.astype("<f8").tobytes(), int_rows[name].astype(np.uint8).tobytes()]
+        else:
+            parts += [b"f", column.astype("<f8").tobytes()]
+    
+    body = b"".join(parts)
+    return body + struct.pack("<I", zlib.crc32(body))
+
+def decode_report(data):
+    """
+    Decode a report encoded with encode_report.
+    
+    The forecast days are DailySummary objects over an HourlyBuffer that reads
+    the columns in place, so decoding doesn't build any hourly records; they
+    are built the first time a day's "hourly" list is read, as with lazy_hourly.
+    
+    Args:
+        data (bytes): The encoded report
+        
+    Returns:
+        dict: The processed weather data
+        
+    Raises:
+        ValueError: If the data is not a complete report in this format version
+    """
+    if data[:4] != REPORT_MAGIC:
+        raise ValueError("Not an encoded weather report (or an older format version)")
+    if len(data) < 8 or struct.unpack_from("<I", data, len(data) - 4)[0] != zlib.crc32(memoryview(data)[:-4]):
+        raise ValueError("Corrupt encoded weather report: checksum mismatch")
+    try:
+        weather_data, day_lengths, buffer = _decode_report_parts(memoryview(data)[:-4])
+    except (struct.error, ValueError, TypeError, KeyError, IndexError) as exc:
+        raise ValueError(f"Corrupt encoded weather report: {exc}") from exc
+    
+    if "forecast" in weather_data:
+        forecast = []
+        position = 0
+        for day, length in zip(weather_data["forecast"], day_lengths):
+            forecast.append(DailySummary(day, buffer, position, position + length))
+            position += length
+        weather_data["forecast"] = ForecastDays(forecast)
+    
+    return weather_data
+
+def _decode_report_parts(view):
+    """
+    Read the sections of an encoded report, checking that they fit together.
+    
+    Returns:
+        tuple: (report without hourly data, readings per day, HourlyBuffer)
+    """
+    offset = 4
+    (meta_length,) = struct.unpack_from("<I", view, offset)
+    offset += 4
+    weather_data = json_loads(bytes(view[offset:offset + meta_length]))
+    offset += meta_length
+    
+    count, day_count = struct.unpack_from("<IH", view, offset)
+    offset += 6
+    day_lengths = np.frombuffer(view, dtype="<u2", count=day_count, offset=offset).tolist()
+    offset += 2 * day_count
+    
+    (table_length,) = struct.unpack_from("<I", view, offset)
+    offset += 4
+    weather_table = [tuple(weather) for weather in json_loads(bytes(view[offset:offset + table_length]))]
+    offset += table_length
+    codes = np.frombuffer(view, dtype="<u2", count=count, offset=offset)
+    offset += 2 * count
+    
+    columns = {"dt": np.frombuffer(view, dtype="<i8", count=count, offset=offset)}
+    offset += 8 * count
+    int_rows = {}
+    for name in REPORT_COLUMNS:
+        kind = bytes(view[offset:offset + 1])
+        offset += 1
+        columns[name] = np.frombuffer(view, dtype="<i8" if kind == b"i" else "<f8", count=count, offset=offset)
+        offset += 8 * count
+        if kind == b"m":
+            int_rows[name] = np.frombuffer(view, dtype=bool, count=count, offset=offset)
+            offset += count
+    
+    forecast = weather_data.get("forecast", []) if isinstance(weather_data, dict) else None
+    if (forecast is None or offset != len(view) or sum(day_lengths) != count
+            or len(forecast) != day_count or not all(isinstance(day, dict) for day in forecast)
+            or (count and int(codes.max()) >= len(weather_table))
+            or not all(len(weather) == 3 for weather in weather_table)):
+        raise ValueError("sections don't match")
+    
+    return weather_data, day_lengths, HourlyBuffer.from_columns(columns, int_rows, codes, weather_table)
+
+def pack_report(weather_data):
+    """
+    Serialise a report into a compact compressed form.
+    
+    Reports processed with lazy_hourly are written in the binary format straight
+    from their HourlyBuffer, uncompressed: the float columns barely compress and
+    zlib would cost more than encoding. Other reports are written as zlib-compressed
+    JSON when orjson or ujson is installed, since gathering their hourly records
+    into columns in Python costs more than those codecs take to serialise them.
+    """
+    if JSON_CODEC != "json" and _report_buffer(weather_data) is None:
+        return zlib.compress(json_dumps(plain_report(weather_data)), 1)
+    return encode_report(weather_data)
+
+def unpack_report(payload):
+    """
+    Rebuild a report serialised with pack_report.
+    
+    Raises:
+        ValueError: For any payload that can't be read as a report (corrupt,
+            truncated or written in another format)
+    """
+    if payload[:3] == REPORT_MAGIC[:3]:
+        return decode_report(payload)
+    try:
+        data = zlib.decompress(payload)
+    except zlib.error as exc:
+        raise ValueError(f"Unreadable report payload: {exc}") from exc
+    if data[:3] == REPORT_MAGIC[:3]:
+        return decode_report(data)  # Compressed by an earlier version
+    try:
+        weather_data = json_loads(data)
+    except ValueError as exc:  # orjson and ujson errors are ValueErrors too
+        raise ValueError(f"Unreadable report payload: {exc}") from exc
+    if not isinstance(weather_data, dict):
+        raise ValueError("Unreadable report payload: not a report")
+    if isinstance(weather_data.get("forecast"), list):
+        weather_data["forecast"] = ForecastDays(weather_data["forecast"])
+    return weather_data
+
+def benchmark_report_codecs(weather_data, repeat=200):
+    """
+    Compare encoding formats for a report: size, encode and decode time, and
+    whether the report survives a round trip unchanged.
+    
+    The report is encoded as given, so a lazy_hourly report measures encoding
+    straight from its HourlyBuffer. The binary formats decode lazily, so
+    "binary+hourly" also times building every hourly record after decoding,
+    for callers that read them all. Times are the best of five runs.
+    
+    Args:
+        weather_data (dict): The processed weather data to encode
+        repeat (int): Number of encode/decode cycles in each run
+        
+    Returns:
+        dict: format name -> {"bytes", "encode_us", "decode_us", "round_trip"}
+    """
+    report = plain_report(weather_data)
+    codecs = {
+        "json": (lambda r: json.dumps(r).encode("utf-8"), lambda b: json.loads(b)),
+        JSON_CODEC + " (compact)": (json_dumps, json_loads),
+        "json_dumps+zlib": (lambda r: zlib.compress(json_dumps(r), 1), lambda b: json_loads(zlib.decompress(b))),
+        "pickle": (lambda r: pickle.dumps(r, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        "binary": (encode_report, decode_report),
+        "binary+hourly": (encode_report, lambda b: plain_report(decode_report(b))),
+        "binary+zlib": (lambda r: zlib.compress(encode_report(r), 1), lambda b: decode_report(zlib.decompress(b))),
+        "pack_report": (pack_report, unpack_report)
+    }
+    
+    def best_time(func, arg):
+        runs = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func(arg)
+            runs.append((time.perf_counter() - start) / repeat)
+        return min(runs)
+    
+    results = {}
+    for name, (encode, decode) in codecs.items():
+        # JSON and pickle can only take plain dicts; the binary codecs take the report as is
+        source = weather_data if name.startswith(("binary", "pack")) else report
+        encoded = encode(source)
+        results[name] = {
+            "bytes": len(encoded),
+            "encode_us": best_time(encode, source) * 1e6,
+            "decode_us": best_time(decode, encoded) * 1e6,
+            "round_trip": plain_report(decode(encoded)) == report
+        }
+    return results
+
+
+class SharedReportCache:
+    """
+    Cache of processed reports that all processes on one machine share.
+    
+    Each process (and thread) opens its own connection to the same SQLite file; WAL
+    mode lets readers carry on while another process writes. Reports are stored
+    with pack_report. Entries expire ttl
+    seconds after they were fetched, like the in-process TileCache.
+    
+    The get_weather_data method has the same signature as the module function, so it
+    can be passed as the fetch function of run_weather_advisor, run_batch,
+    RefreshScheduler or TileCache.
+    """
+
+    def __init__(self, path=None, fetch=None, clock=time.time, **config):
+        for key in config:
+            if key not in SHARED_CACHE_CONFIG:
+                raise ValueError(f"Unknown shared cache option: {key}")
+        self.config = dict(SHARED_CACHE_CONFIG, **config)
+        self.path = path or self.config["path"]
+        self.fetch = fetch or get_weather_data
+        self.clock = clock
+        self._local = threading.local()
+        
+        connection = self._connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS reports ("
+                           "key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, payload BLOB NOT NULL)")
+        connection.commit()
+
+    def _connection(self):
+        # Connections can't be shared between threads or across fork(), so keep one
+        # per thread and reopen it in a child process
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.config["busy_timeout"] / 1000)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={int(self.config['busy_timeout'])}")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _key(self, location, forecast_days, coordinates):
+        if coordinates is not None:
+            return f"@{coordinates[0]:.4f},{coordinates[1]:.4f}/{forecast_days}"
+        return f"{location.strip().lower()}/{forecast_days}"
+
+    def get(self, location, forecast_days=5, coordinates=None):
+        """
+        Return a fresh cached report, or None if there isn't one.
+        Entries that can't be read (corrupt, or written in another format) are
+        deleted and treated as missing.
+        """
+        key = self._key(location, forecast_days, coordinates)
+        connection = self._connection()
+        row = connection.execute("SELECT fetched_at, payload FROM reports WHERE key = ?", (key,)).fetchone()
+        if row is None or self.clock() - row[0] >= self.config["ttl"]:
+            return None
+        try:
+            return unpack_report(row[1])
+        except (ValueError, zlib.error):
+            count_metric("cache_errors", cache="shared")
+            with connection:
+                # Only delete the row we read, not one another process has just replaced
+                connection.execute("DELETE FROM reports WHERE key = ? AND fetched_at = ?", (key, row[0]))
+            return None
+
+    def set(self, location, weather_data, forecast_days=5, coordinates=None):
+        """
+        Store a report for every process to use.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO reports (key, fetched_at, payload) VALUES (?, ?, ?)",
+                (self._key(location, forecast_days, coordinates), self.clock(), pack_report(weather_data))
+            )
+
+    def purge_expired(self):
+        """
+        Delete expired reports.
+        
+        Returns:
+            int: Number of reports deleted
+        """
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute("DELETE FROM reports WHERE fetched_at <= ?",
+                                        (self.clock() - self.config["ttl"],))
+        return cursor.rowcount
+
+    def get_weather_data(self, location=None, forecast_days=5, coordinates=None):
+        """
+        Retrieve weather data from the shared cache, fetching and storing it if missing or stale.
+        
+        Args:
+            location (str): City or location name
+            forecast_days (int): Number of days to forecast (1-5)
+            coordinates (tuple): Optional (lat, lon) to look up instead of the location name
+            
+        Returns:
+            dict: Weather data including current conditions and forecast
+        """
+        forecast_days = max(1, min(forecast_days, 5))
+        weather_data = self.get(location, forecast_days, coordinates)
+        if weather_data is not None:
+            count_metric("cache_hits", cache="shared")
+            return weather_data
+        
+        count_metric("cache_misses", cache="shared")
+        weather_data = self.fetch(location, forecast_days, coordinates=coordinates)
+        if "error" not in weather_data:
+            self.set(location, weather_data, forecast_days, coordinates)
+        return weather_data
+
+# Refresh scheduler configuration
+# The 5 day / 3 hour forecast is re-issued every 3 hours and current conditions
+# roughly every 10 minutes, so fetching more often than that only repeats data
+SCHEDULER_CONFIG = {
+    "forecast_interval": 3 * 3600,  # Seconds between upstream forecast runs
+    "current_interval": 600,        # Seconds between upstream current-condition updates
+    "track_current": False,         # Also refresh when current conditions go stale
+    "publish_delay": 300,           # Wait this long after a step passes for the new run to appear
+    "min_interval": 300,            # Never refresh a location more often than this
+    "max_age": 6 * 3600,            # Always refresh data older than this
+    "spread": 600,                  # Spread due times over this many seconds to avoid bursts
+    "max_per_tick": 20,             # Most locations fetched in one run_pending call
+    "tick_interval": 5.0,           # Seconds run_forever waits between ticks
+    "retry_delay": 120,             # First retry delay after a failed fetch (doubles each time)
+    "max_retry_delay": 3600
+}
+
+def next_refresh_time(weather_data, fetched_at, config=None):
+    """
+    Work out when fetching a location again would give new data.
+    
+    The forecast window moves on when its first step is in the past, so the next
+    useful refresh is just after that step (plus time for the upstream run to be
+    published). Current conditions become stale current_interval after their timestamp.
+    
+    Args:
+        weather_data (dict): The processed weather data from the last fetch
+        fetched_at (float): When it was fetched, in seconds since the epoch
+        config (dict): Scheduler settings (defaults to SCHEDULER_CONFIG)
+        
+    Returns:
+        float: Time of the next refresh in seconds since the epoch
+    """
+    config = config or SCHEDULER_CONFIG
+    candidates = [fetched_at + config["max_age"]]
+    
+    step_times, _ = hourly_columns(weather_data)
+    future_steps = step_times[step_times > fetched_at]
+    if len(future_steps):
+        candidates.append(float(future_steps.min()) + config["publish_delay"])
+    else:
+        candidates.append(fetched_at + config["forecast_interval"])
+    
+    if config["track_current"] and "current" in weather_data:
+        observed = datetime.strptime(weather_data["current"]["timestamp"], '%Y-%m-%d %H:%M:%S').timestamp()
+        candidates.append(observed + config["current_interval"])
+    
+    return max(fetched_at + config["min_interval"], min(candidates))
+
+
+class RefreshScheduler:
+    """
+    Keep a watch list of locations fresh with as few upstream calls as possible.
+    Due times are kept in a heap so each tick only looks at locations that are due.
+    
+    Usage:
+        scheduler = RefreshScheduler(["Perth", "Sydney"])
+        scheduler.run_pending()          # Fetch whatever is due now
+        data = scheduler.get("Perth")
+    """
+
+    def __init__(self, locations=(), fetch=None, clock=time.time, **config):
+        for key in config:
+            if key not in SCHEDULER_CONFIG:
+                raise ValueError(f"Unknown scheduler option: {key}")
+        self.config = dict(SCHEDULER_CONFIG, **config)
+        self.fetch = fetch or get_weather_data
+        self.clock = clock
+        self.reports = {}      # location -> latest good weather data
+        self.due = {}          # location -> due time currently in the heap
+        self.failures = {}     # location -> number of failed fetches in a row
+        self._heap = []
+        self._counter = 0      # Tie-breaker so the heap never compares locations
+        for location in locations:
+            self.add(location)
+
+    def _key(self, location):
+        return location.strip().lower()
+
+    def _offset(self, key):
+        # Stable per-location offset so locations on the same cadence don't all fire together
+        return (zlib.crc32(key.encode("utf-8")) % 1000) / 1000 * self.config["spread"]
+
+    def _schedule(self, key, when):
+        self.due[key] = when
+        self._counter += 1
+        heapq.heappush(self._heap, (when, self._counter, key))
+
+    def add(self, location, when=None):
+        """
+        Add a location to the watch list. New locations are due at their offset
+        within the next spread seconds, so a long watch list doesn't fetch in one burst.
+        """
+        key = self._key(location)
+        if key not in self.due:
+            self._schedule(key, self.clock() + self._offset(key) if when is None else when)
+
+    def remove(self, location):
+        """
+        Stop watching a location. Its heap entry is skipped when it comes up.
+        """
+        key = self._key(location)
+        self.due.pop(key, None)
+        self.reports.pop(key, None)
+        self.failures.pop(key, None)
+
+    def get(self, location):
+        """
+        Return the latest weather data for a watched location, or None.
+        """
+        return self.reports.get(self._key(location))
+
+    def next_due(self):
+        """
+        Return the earliest due time, or None if nothing is watched.
+        """
+        while self._heap:
+            when, _, key = self._heap[0]
+            if self.due.get(key) == when:
+                return when
+            heapq.heappop(self._heap)  # Stale entry for a removed or rescheduled location
+        return None
+
+    def run_pending(self, now=None):
+        """
+        Fetch the locations that are due, up to max_per_tick of them.
+        
+        Args:
+            now (float): Current time (defaults to the scheduler's clock). When given,
+                it is also used as the fetch time, so callers can drive the scheduler
+                on their own clock.
+            
+        Returns:
+            list: Locations that were fetched
+        """
+        clock = self.clock if now is None else (lambda: now)
+        now = clock()
+        refreshed = []
+        
+        while len(refreshed) < self.config["max_per_tick"]:
+            when = self.next_due()
+            if when is None or when > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            
+            weather_data = self.fetch(key)
+            fetched_at = clock()
+            refreshed.append(key)
+            count_metric("scheduler_fetches")
+            
+            if "error" in weather_data:
+                failures = self.failures.get(key, 0) + 1
+                self.failures[key] = failures
+                delay = min(self.config["retry_delay"] * 2 ** (failures - 1), self.config["max_retry_delay"])
+                count_metric("scheduler_errors")
+                self._schedule(key, fetched_at + delay)
             else:
-                weather_data = new_weather_data
-                print(f"\nLocation changed to {weather_data['location']['name']}, {weather_data['location']['country']}")
-                input("Press Enter to continue...")
-                
-        elif choice == 8:  # Exit
-            print("\nThank you for using the Weather Advisor Application. Goodbye!")
-            break
+                self.failures.pop(key, None)
+                self.reports[key] = weather_data
+                due = next_refresh_time(weather_data, fetched_at, self.config)
+                self._schedule(key, due + self._offset(key))
+        
+        return refreshed
+
+    def run_forever(self, stop_event=None, poll_interval=1.0):
+        """
+        Keep refreshing until stop_event (a threading.Event) is set.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.run_pending()
+            when = self.next_due()
+            if when is None:
+                wait = poll_interval
+            else:
+                # Even if more locations are already due, leave tick_interval between
+                # ticks so a backlog is worked off max_per_tick at a time
+                wait = min(max(self.config["tick_interval"], when - self.clock()), 60.0)
+            stop_event.wait(wait)
+
+# Alert rules
+# Field names people are likely to write in a rule, mapped to TIMESERIES_FIELDS keys
+ALERT_FIELD_ALIASES = {
+    "temp": "temperature",
+    "precipitation": "pop",
+    "precipitation chance": "pop",
+    "rain chance": "pop",
+    "wind": "wind_speed",
+    "wind speed": "wind_speed",
+    "gust": "wind_speed"
+}
+
+ALERT_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal
+}
+
+def compile_alert_rule(rule, name=None):
+    """
+    Turn an alert rule into the form the AlertEngine evaluates.
+    
+    Rules can be written as text, e.g. "pop > 70 tomorrow", "wind > 15 next 24h"
+    or "temperature < 2 today", or given as a dict with field, op, value and window keys.
+    A window is "today", "tomorrow", "next Nh" or None for the whole forecast.
+    
+    Args:
+        rule (str or dict): The rule
+        name (str): Name reported in alert events (defaults to the rule text)
+        
+    Returns:
+        dict: Compiled rule with field, op, value, window and how (the aggregation used)
+    """
+    if isinstance(rule, str):
+        match = re.match(r"^\s*([a-z_ ]+?)\s*(>=|<=|>|<)\s*(-?[\d.]+)\s*(?:%|m/s|mm|°c|c)?"
+                         r"\s*(?:in\s+)?(?:the\s+)?(today|tomorrow|next\s+\d+\s*h(?:ours?)?)?\s*$",
+                         rule.lower())
+        if not match:
+            raise ValueError(f"Can't understand alert rule: {rule}")
+        compiled = {
+            "name": name or rule,
+            "field": match.group(1),
+            "op": match.group(2),
+            "value": float(match.group(3)),
+            "window": match.group(4)
+        }
+    else:
+        compiled = dict(rule)
+        compiled.setdefault("name", name or f"{compiled['field']} {compiled['op']} {compiled['value']}")
+        compiled.setdefault("window", None)
+    
+    compiled["field"] = ALERT_FIELD_ALIASES.get(compiled["field"], compiled["field"])
+    if compiled["field"] not in TIMESERIES_FIELDS:
+        raise ValueError(f"Unknown alert field: {compiled['field']}")
+    if compiled["op"] not in ALERT_OPERATORS:
+        raise ValueError(f"Unknown alert operator: {compiled['op']}")
+    
+    window = compiled["window"]
+    if window and window not in ("today", "tomorrow"):
+        hours = re.match(r"next\s+(\d+)", window)
+        if not hours:
+            raise ValueError(f"Unknown alert window: {window}")
+        compiled["window"] = f"next {int(hours.group(1))}h"
+    
+    # An upper threshold fires if any reading is above it, a lower one if any is below it
+    compiled.setdefault("how", "max" if compiled["op"].startswith(">") else "min")
+    return compiled
+
+def _alert_window(window, now):
+    """
+    Turn a compiled rule window into (start, end) seconds since the epoch.
+    """
+    if window is None:
+        return None, None
+    if window == "today":
+        return day_bounds(0, now)
+    if window == "tomorrow":
+        return day_bounds(1, now)
+    hours = int(re.match(r"next (\d+)h", window).group(1))
+    return now, now + hours * 3600
+
+def _report_fingerprint(weather_data, fields):
+    """
+    Checksum of a report's hourly readings: their times and their values in the
+    given fields. Lazy reports are read from their HourlyBuffer columns.
+    """
+    times, values = hourly_columns(weather_data, fields)
+    checksum = zlib.crc32(times.tobytes())
+    for field in fields:
+        checksum = zlib.crc32(values[field].tobytes(), checksum)
+    return checksum
+
+
+class AlertEngine:
+    """
+    Evaluate threshold alert rules across a watch list of locations.
+    
+    Each update only looks at locations whose data changed: a report that is the
+    same object as last time is skipped outright, and a new one is only evaluated
+    if its hourly readings (in the fields the rules use) differ. The changed
+    reports are stacked into a WeatherComparison, so every rule is one vectorised
+    predicate over them. Events are edge-triggered: a rule fires once when it
+    becomes true for a location and clears once when it stops being true.
+    
+    Replace a location's report to update it (as RefreshScheduler does after each
+    fetch) rather than editing it in place, or pass force=True.
+    
+    Usage:
+        engine = AlertEngine(["pop > 70 tomorrow", "wind > 15 next 24h"])
+        for event in engine.update({"Perth": perth_data, "Sydney": sydney_data}):
+            print(event)
+    """
+
+    def __init__(self, rules=()):
+        self.rules = [compile_alert_rule(rule) for rule in rules]
+        self.reports = {}        # location -> report seen in the last update
+        self.fingerprints = {}   # location -> fingerprint of the last evaluated readings
+        self.active = {}         # location -> set of names of rules currently true
+        self.evaluated_day = None  # Local date of the last update, for today/tomorrow windows
+        self._rules_changed = False
+
+    def add_rule(self, rule, name=None):
+        """
+        Add a rule. It is checked against every location on the next update.
+        """
+        compiled = compile_alert_rule(rule, name)
+        self.rules.append(compiled)
+        self._rules_changed = True
+        return compiled
+
+    def remove(self, location):
+        """
+        Forget a location and any alerts active for it.
+        """
+        self.reports.pop(location, None)
+        self.fingerprints.pop(location, None)
+        self.active.pop(location, None)
+
+    def update(self, reports, now=None, force=False):
+        """
+        Re-evaluate rules for locations whose readings changed. Every location is
+        re-evaluated after a rule is added and, for "today"/"tomorrow" rules, when
+        the day rolls over.
+        
+        Args:
+            reports (dict): location -> processed weather data (e.g. RefreshScheduler.reports)
+            now (float): Evaluation time, used for the rule windows and to tell
+                when the day has rolled over (defaults to time.time())
+            force (bool): Re-evaluate every location, e.g. so that "next Nh" windows
+                move on without new data
+            
+        Returns:
+            list: Events, each a dict with rule, location, state ('triggered' or 'cleared'),
+                value and time
+        """
+        now = time.time() if now is None else now
+        if not self.rules:
+            return []
+        
+        # Calendar windows cover different readings once the day rolls over
+        today = datetime.fromtimestamp(now).date()
+        if self.evaluated_day != today and any(rule["window"] in ("today", "tomorrow") for rule in self.rules):
+            force = True
+        self.evaluated_day = today
+        if self._rules_changed:
+            force = True
+            self._rules_changed = False
+        
+        fields = sorted({rule["field"] for rule in self.rules})
+        changed = []
+        for location, weather_data in reports.items():
+            if "error" in weather_data:
+                continue
+            if not force and self.reports.get(location) is weather_data:
+                continue
+            self.reports[location] = weather_data
+            fingerprint = _report_fingerprint(weather_data, fields)
+            if force or self.fingerprints.get(location) != fingerprint:
+                self.fingerprints[location] = fingerprint
+                changed.append(location)
+        
+        if not changed:
+            return []
+        
+        comparison = WeatherComparison([reports[location] for location in changed], fields)
+        
+        now_true = {location: set() for location in changed}
+        values_by_rule = {}
+        for rule in self.rules:
+            start, end = _alert_window(rule["window"], now)
+            values = comparison.aggregate(rule["field"], start, end, rule["how"])
+            with np.errstate(invalid="ignore"):
+                passed = ALERT_OPERATORS[rule["op"]](values, rule["value"])
+            values_by_rule[rule["name"]] = values
+            for row in np.flatnonzero(passed):
+                now_true[changed[row]].add(rule["name"])
+        
+        events = []
+        for row, location in enumerate(changed):
+            before = self.active.get(location, set())
+            after = now_true[location]
+            for name in sorted(after - before):
+                events.append({"rule": name, "location": location, "state": "triggered",
+                               "value": float(values_by_rule[name][row]), "time": now})
+            for name in sorted(before - after):
+                value = values_by_rule[name][row] if name in values_by_rule else np.nan
+                events.append({"rule": name, "location": location, "state": "cleared",
+                               "value": float(value), "time": now})
+            self.active[location] = after
+        
+        count_metric("alert_events", len(events))
+        return events
 
 # Run the application if this script is executed directly
 if __name__ == "__main__":
-    run_weather_advisor()
+    parser = argparse.ArgumentParser(description="WeatherWise Advisor")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each menu action with cProfile and tracemalloc")
+    parser.add_argument("--profile-dir", default=PROFILE_CONFIG["output_dir"],
+                        help="directory for profile reports (default: %(default)s)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer questions from a JSONL or text file ('-' for stdin) instead of running the menu")
+    parser.add_argument("--output", metavar="FILE", default="-",
+                        help="where batch answers are written as JSONL (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for batch answers (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="questions held in memory at a time in batch mode (default: %(default)s)")
+    parser.add_argument("--default-location",
+                        help="location for batch questions that don't name one")
+    parser.add_argument("--shared-cache", metavar="FILE",
+                        help="SQLite file for a report cache shared by all advisor and batch processes")
+    args = parser.parse_args()
+
+    PROFILE_CONFIG["enabled"] = args.profile
+    PROFILE_CONFIG["output_dir"] = args.profile_dir
+    fetch = SharedReportCache(args.shared_cache).get_weather_data if args.shared_cache else None
+
+    if args.batch:
+        input_stream = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            summary = run_batch(input_stream, output_stream, workers=args.workers,
+                                chunk_size=args.chunk_size, default_location=args.default_location,
+                                fetch=fetch)
+        finally:
+            if input_stream is not sys.stdin:
+                input_stream.close()
+            if output_stream is not sys.stdout:
+                output_stream.close()
+        print(f"Answered {summary['questions']} questions in {summary['chunks']} chunk(s).", file=sys.stderr)
+    else:
+        run_weather_advisor(fetch)